@@ -15,7 +15,37 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed",
 )
-apply_theme(hide_sidebar=True)
+# 페이지 전용 스타일 (카드) → 테마 <style> 블록에 합쳐 한 번에 전송
+_CARD_CSS = """
+      .ui-card{
+        background: rgba(255,255,255,.08);
+        backdrop-filter: blur(10px);
+        -webkit-backdrop-filter: blur(10px);
+        border-radius:16px; padding:14px 16px 16px;
+        box-shadow:0 4px 18px rgba(0,0,0,.25), inset 0 0 0 1px rgba(255,255,255,.05);
+        transition: transform .15s ease, background .25s ease;
+        min-height: 130px;
+      }
+      .ui-card:hover{ background: rgba(255,255,255,.12); transform: translateY(-1px); }
+
+      a.card-link {
+        display:block;
+        text-decoration:none !important;
+        color:inherit !important;
+        -webkit-tap-highlight-color: transparent;
+        outline:none !important;
+      }
+      a.card-link:hover,
+      a.card-link:active,
+      a.card-link *{ text-decoration:none !important; }
+
+      .row{ display:flex; align-items:center; gap:10px; margin-bottom:6px; }
+      .row img{ width:36px; height:36px; flex:0 0 auto; }
+      .row .title{ font-weight:800; font-size:1.1rem; margin:0; color:#fff; }
+
+      .desc{ margin:0; color:rgba(255,255,255,.85); }
+"""
+apply_theme(hide_sidebar=True, page_css=_CARD_CSS)
 
 # --------------------------------------------------------------------
 # 쿼리 파라미터로 페이지 전환 (카드 전체 클릭용)
@@ -57,44 +87,6 @@ ICONS = {
     "create": resolve_icon("create"),
 }
 
-# --------------------------------------------------------------------
-# 페이지 전용 스타일 (카드)
-# --------------------------------------------------------------------
-st.markdown(
-    """
-    <style>
-      .ui-card{
-        background: rgba(255,255,255,.08);
-        backdrop-filter: blur(10px);
-        -webkit-backdrop-filter: blur(10px);
-        border-radius:16px; padding:14px 16px 16px;
-        box-shadow:0 4px 18px rgba(0,0,0,.25), inset 0 0 0 1px rgba(255,255,255,.05);
-        transition: transform .15s ease, background .25s ease;
-        min-height: 130px;
-      }
-      .ui-card:hover{ background: rgba(255,255,255,.12); transform: translateY(-1px); }
-
-      a.card-link {
-        display:block;
-        text-decoration:none !important;
-        color:inherit !important;
-        -webkit-tap-highlight-color: transparent;
-        outline:none !important;
-      }
-      a.card-link:hover,
-      a.card-link:active,
-      a.card-link *{ text-decoration:none !important; }
-
-      .row{ display:flex; align-items:center; gap:10px; margin-bottom:6px; }
-      .row img{ width:36px; height:36px; flex:0 0 auto; }
-      .row .title{ font-weight:800; font-size:1.1rem; margin:0; color:#fff; }
-
-      .desc{ margin:0; color:rgba(255,255,255,.85); }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
 # --------------------------------------------------------------------
 # 본문
 # --------------------------------------------------------------------
@@ -122,25 +114,27 @@ cards = [
     },
 ]
 
-cols = st.columns(3)
-for col, c in zip(cols, cards):
-    with col:
-        b64 = icon_b64(c["icon"]) if Path(c["icon"]).exists() else ""
-        href = f"?nav={quote(c['path'])}"
-        st.markdown(
-            f"""
+# 카드 HTML은 정적(아이콘 base64 포함) → 리런마다 파일 읽기/인코딩 없이 1회 생성한 문자열 재사용
+@st.cache_data(show_spinner=False)
+def card_html(icon: str, title: str, desc: str, path: str) -> str:
+    b64 = icon_b64(Path(icon)) if Path(icon).exists() else ""
+    href = f"?nav={quote(path)}"
+    return f"""
             <a class="card-link" href="{href}" target="_self" rel="noopener">
               <div class="ui-card">
                 <div class="row">
                   {'<img src="data:image/png;base64,'+b64+'" alt="icon"/>' if b64 else ''}
-                  <div class="title">{c["title"]}</div>
+                  <div class="title">{title}</div>
                 </div>
-                <p class="desc">{c["desc"]}</p>
+                <p class="desc">{desc}</p>
               </div>
             </a>
-            """,
-            unsafe_allow_html=True,
-        )
+            """
+
+cols = st.columns(3)
+for col, c in zip(cols, cards):
+    with col:
+        st.markdown(card_html(str(c["icon"]), c["title"], c["desc"], c["path"]), unsafe_allow_html=True)
 
 st.divider()
 st.caption("Version: v3")
@@ -32,6 +32,10 @@ for _p in (str(_ROOT), str(_ITEM_CREATOR_DIR)):
 # 유틸: 파일 경로에서 모듈 직접 로드
 # -----------------------------------------------------------------------------
 def _load_module_from_path(modname: str, path: Path):
+    # 이미 같은 파일로 로드된 모듈이면 재실행하지 않고 그대로 사용 (stat/exec 생략)
+    cached = sys.modules.get(modname)
+    if cached is not None and getattr(cached, "__file__", None) == str(path):
+        return cached
     if not path.exists():
         return None
     spec = importlib.util.spec_from_file_location(modname, path)
@@ -18,29 +18,10 @@ from .utils_common import (
     get_env, load_env
 )
 from .upload_apply import collect_xlsx_files, apply_uploaded_files
-from .main_controller import ShopeeAutomation
+# ShopeeAutomation(automation_steps → gspread/pandas, ~0.5s)은 실행 버튼을 눌렀을 때 import
 
-
-def run() -> None:
-    """Bridge(멀티페이지) 환경에서 호출되는 진입점."""
-    # (중요) 환경/설정 로드: import 시점이 아니라 실행 시점에 로드
-    load_env()
-
-    # ---- 세션 상태 초기화 ----
-    defaults = {
-        "upload_success": False,
-        "automation_success": False,
-        "download_file": None,
-    }
-    for k, v in defaults.items():
-        st.session_state.setdefault(k, v)
-
-    # ---- 헤더 / 타이틀 ----
-    title_with_icon("Copy Template", "copy")
-
-    # ---- CSS ----
-    st.markdown(
-        """
+# 페이지 전용 CSS (rerun 마다 문자열을 다시 만들지 않도록 모듈 상수로 유지)
+_PAGE_CSS = """
 <style>
 html, body, [class*="st-"] { font-family: 'Inter','Noto Sans KR',sans-serif; }
 div[data-testid="stAppViewContainer"] > .main .block-container {
@@ -61,19 +42,35 @@ div[data-testid="stAppViewContainer"] > .main .block-container {
 h1, h2, h3, h5 { font-weight: 700; }
 .dialog-description { font-size: 0.9rem; color: #4A4A4A; margin-top: -5px; margin-bottom: 1.5rem; line-height: 1.5; }
 </style>
-""",
-        unsafe_allow_html=True,
-    )
+"""
+_GUIDE_HTML = """
+<p>아래 영역에 BASIC, MEDIA, SALES 엑셀 파일을 업로드하고 샵 코드를 입력한 후, 실행 버튼을 눌러주세요.</p>
+"""
+# CSS + 가이드를 한 번의 markdown 델타로 전송
+_HEADER_HTML = _PAGE_CSS + _GUIDE_HTML
+
+
+def run() -> None:
+    """Bridge(멀티페이지) 환경에서 호출되는 진입점."""
+    # (중요) 환경/설정 로드: import 시점이 아니라 실행 시점에 로드
+    load_env()
+
+    # ---- 세션 상태 초기화 ----
+    defaults = {
+        "upload_success": False,
+        "automation_success": False,
+        "download_file": None,
+    }
+    for k, v in defaults.items():
+        st.session_state.setdefault(k, v)
+
+    # ---- 헤더 / 타이틀 ----
+    title_with_icon("Copy Template", "copy")
 
     # ---- 메인 앱 ----
     def main_application():
-        # 상단 가이드 (설정 다이얼로그 버튼 제거됨)
-        st.markdown(
-            """
-<p>아래 영역에 BASIC, MEDIA, SALES 엑셀 파일을 업로드하고 샵 코드를 입력한 후, 실행 버튼을 눌러주세요.</p>
-""",
-            unsafe_allow_html=True,
-        )
+        # 페이지 CSS + 상단 가이드 (설정 다이얼로그 버튼 제거됨)
+        st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
         # --- 입력 영역 ---
         st.subheader("1. 파일 및 샵 코드 입력")
@@ -123,6 +120,8 @@ h1, h2, h3, h5 { font-weight: 700; }
 
                     # 2) 자동화
                     st.write("2/3 - 템플릿 생성 자동화 진행 중... (Step 1~6)")
+                    from .main_controller import ShopeeAutomation
+
                     automation = ShopeeAutomation()
                     progress_bar = st.progress(0, text="자동화 단계를 시작합니다...")
                     log_container = st.empty()
@@ -22,7 +22,7 @@ import pandas as pd
 
 
 from .utils_common import (
-    load_env, with_retry, safe_worksheet, header_key, top_of_category,
+    load_env, with_retry, safe_worksheet, ensure_worksheet, fetch_values, fetch_values_batch, header_key, top_of_category,
     get_tem_sheet_name, get_env, get_bool_env, hex_to_rgb01, strip_category_id
 )
 
@@ -67,22 +67,18 @@ def _append_failures(sh, rows: List[List[str]]):
     """Failures 탭에 rows를 append. 공간 부족 시 자동 resize."""
     if not rows:
         return
-    try:
-        ws = safe_worksheet(sh, "Failures")
-        vals = with_retry(lambda: ws.get_all_values()) or []
-        start_row = len(vals) + 1
-        end_row = start_row + len(rows) - 1
+    # 시트가 아예 없는 경우 새로 만듦 (main_controller에서 초기화하지만 안전장치)
+    ws = ensure_worksheet(sh, "Failures", rows=1000, cols=10)
+    vals = with_retry(lambda: ws.get_all_values()) or []
+    if not vals:
+        rows = [["PID","Category","Name","Reason","Detail"]] + rows
+    start_row = len(vals) + 1
+    end_row = start_row + len(rows) - 1
 
-        if end_row > ws.row_count:
-            with_retry(lambda: ws.resize(rows=end_row + 100, cols=max(ws.col_count, 10)))
+    if end_row > ws.row_count:
+        with_retry(lambda: ws.resize(rows=end_row + 100, cols=max(ws.col_count, 10)))
 
-        with_retry(lambda: ws.update(values=rows, range_name=f"A{start_row}"))
-
-    except WorksheetNotFound:
-         # 시트가 아예 없는 경우 새로 만듦 (main_controller에서 초기화하지만 안전장치)
-        ws = with_retry(lambda: sh.add_worksheet(title="Failures", rows=1000, cols=10))
-        header = [["PID","Category","Name","Reason","Detail"]]
-        with_retry(lambda: ws.update(values=header + rows, range_name="A1"))
+    with_retry(lambda: ws.update(values=rows, range_name=f"A{start_row}"))
 
 
 # ==============================================================================
@@ -102,15 +98,19 @@ def run_step_1(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
 
     basic_ws = safe_worksheet(sh, "BASIC")
     media_ws = safe_worksheet(sh, "MEDIA")
-    basic_vals = with_retry(lambda: basic_ws.get_all_values())
-    media_vals = with_retry(lambda: media_ws.get_all_values())
+    try:
+        sales_ws = safe_worksheet(sh, "SALES")
+    except Exception:
+        sales_ws = None
+    # BASIC/MEDIA(/SALES)를 batchGet 1회로 함께 읽음 (SALES는 아래에서 캐시 적중)
+    basic_vals, media_vals = fetch_values_batch([basic_ws, media_ws] + ([sales_ws] if sales_ws else []))[:2]
 
     if len(basic_vals) < basic_header or len(media_vals) < media_header:
         print("[!] BASIC or MEDIA 시트가 비어 있습니다.")
         return
 
     template_dict_ws = safe_worksheet(ref, ref_sheet)
-    template_vals = with_retry(lambda: template_dict_ws.get_all_values()) or []
+    template_vals = fetch_values(template_dict_ws)
     template_dict = {
         header_key(row[0]): [str(x or "").strip() for x in row[1:]]
         for row in template_vals[1:] if (row[0] or "").strip()
@@ -148,7 +148,7 @@ def run_step_1(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
     sku_by_pid_opt: dict[tuple[str, str], str] = {}
     try:
         sales_ws = safe_worksheet(sh, "SALES")
-        sales_vals = with_retry(lambda: sales_ws.get_all_values()) or []
+        sales_vals = fetch_values(sales_ws)
         if sales_vals:
             hdr = sales_vals[0]
             pid_idx = _pick_index_by_candidates(hdr, ["product id","pid","item id","et_title_product_id"])
@@ -243,11 +243,8 @@ def run_step_1(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
             out_matrix.append(pid_row + data_row)
 
     if out_matrix:
-        try:
-            tem_ws = safe_worksheet(sh, tem_name)
-            with_retry(lambda: tem_ws.clear())
-        except Exception:
-            tem_ws = with_retry(lambda: sh.add_worksheet(title=tem_name, rows=5000, cols=200))
+        tem_ws = ensure_worksheet(sh, tem_name, rows=5000, cols=200)
+        with_retry(lambda: tem_ws.clear())
 
         max_cols = max(len(r) for r in out_matrix)
         end_a1 = rowcol_to_a1(len(out_matrix), max_cols)
@@ -306,7 +303,7 @@ def run_step_2(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
                 defaults_map.setdefault(k, {}).update(d)
 
     cat_props_ws = safe_worksheet(ref, get_env("CAT_PROPS_SHEET", "cat props"))
-    cat_props_vals = with_retry(lambda: cat_props_ws.get_all_values()) or []
+    cat_props_vals = fetch_values(cat_props_ws)
     catprops_map = {}
     if cat_props_vals:
         hdr_keys = [header_key(x) for x in cat_props_vals[0]]
@@ -369,7 +366,8 @@ def run_step_2(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
         return merged
 
     requests = []
-    color = hex_to_rgb01(color_hex)
+    red, green, blue = hex_to_rgb01(color_hex)
+    color = {"red": red, "green": green, "blue": blue}
     for j, spans in color_ranges_by_col.items():
         for s, e in _merge(spans):
             requests.append({"repeatCell": {"range": {"sheetId": sheet_id, "startRowIndex": s, "endRowIndex": e, "startColumnIndex": 1 + j, "endColumnIndex": 1 + j + 1}, "cell": {"userEnteredFormat": {"backgroundColor": color}}, "fields": "userEnteredFormat.backgroundColor"}})
@@ -400,7 +398,7 @@ def run_step_3(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet, overwrite: boo
     try:
         # Reference 시트에서 FDA 대상 카테고리 목록 읽기
         fda_ws = safe_worksheet(ref, fda_sheet_name)
-        fda_vals_2d = with_retry(lambda: fda_ws.get_values('A:A', value_render_option='UNFORMATTED_VALUE'))
+        fda_vals_2d = fetch_values(fda_ws, 'A:A', value_render_option='UNFORMATTED_VALUE')
         fda_vals = [r[0] for r in (fda_vals_2d or []) if r and str(r[0]).strip()]
         # (개선) 전체 경로를 소문자로 변환하여 비교
         target_categories = {str(cat).strip().lower() for cat in fda_vals if str(cat).strip()}
@@ -471,12 +469,12 @@ def run_step_4(sh: gspread.Spreadsheet, ref: gspread.Spreadsheet):
 
     try:
         margin_ws = safe_worksheet(sh, "MARGIN")
-        margin_vals = with_retry(lambda: margin_ws.get_all_values()) or []
+        margin_vals = fetch_values(margin_ws)
     except Exception: margin_vals = []
 
     try:
         brand_ws = safe_worksheet(ref, "Brand")
-        brand_vals = with_retry(lambda: brand_ws.get_all_values()) or []
+        brand_vals = fetch_values(brand_ws)
     except Exception:
         brand_vals = []
 
@@ -583,10 +581,8 @@ def run_step_5(sh: gspread.Spreadsheet):
     tem_vals = with_retry(lambda: tem_ws.get_all_values()) or []
 
     basic_ws = safe_worksheet(sh, "BASIC")
-    basic_vals = with_retry(lambda: basic_ws.get_all_values()) or []
-    
     margin_ws = safe_worksheet(sh, "MARGIN")
-    margin_vals = with_retry(lambda: margin_ws.get_all_values()) or []
+    basic_vals, margin_vals = fetch_values_batch([basic_ws, margin_ws])
 
     # --- 데이터 맵 준비 ---
     pid_to_desc = {row[0].strip(): (row[3] if len(row) > 3 else "") for row in basic_vals[1:] if row and row[0].strip()}
@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import streamlit as st
-from gspread.exceptions import WorksheetNotFound
-from .utils_common import load_env, open_sheet_by_env, open_ref_by_env, safe_worksheet, with_retry
+from .utils_common import load_env, open_sheets_by_env_parallel, ensure_worksheet, with_retry
 
 # 통합된 automation_steps 하나만 import 합니다.
 from . import automation_steps
@@ -15,23 +14,29 @@ class ShopeeAutomation:
     def __init__(self):
         try:
             load_env()
-            self.sh = open_sheet_by_env()
-            self.ref = open_ref_by_env()
+            # 작업 시트/레퍼런스 시트 open(각 1회 왕복)을 병렬로 겹쳐 초기화 지연 단축
+            self.sh, self.ref = open_sheets_by_env_parallel()
         except Exception as e:
             st.error(f"Google Sheets 연결에 실패했습니다: {e}")
             st.stop()
 
     def _initialize_failures_sheet(self):
         """(신규) Failures 시트를 찾아 초기화하거나 새로 생성합니다."""
-        try:
-            failures_ws = safe_worksheet(self.sh, "Failures")
-            with_retry(lambda: failures_ws.clear())
-        except WorksheetNotFound:
-            failures_ws = with_retry(lambda: self.sh.add_worksheet(title="Failures", rows=1000, cols=10))
-        
-        # 헤더 다시 작성
+        failures_ws = ensure_worksheet(self.sh, "Failures", rows=1000, cols=10)
         header = [["PID","Category","Name","Reason","Detail"]]
-        with_retry(lambda: failures_ws.update(values=header, range_name="A1:E1"))
+
+        # 헤더(A1:E1)와 데이터 영역(A2:Z) 전체를 batchGet 1회로 읽어서 이미 비어 있으면 쓰기 요청 생략
+        resp = with_retry(lambda: self.sh.values_batch_get(["'Failures'!A1:E1", "'Failures'!A2:Z"])) or {}
+        vrs = (resp.get("valueRanges") or []) + [{}, {}]
+        head = vrs[0].get("values") or []
+        has_data = any(str(c).strip() for row in vrs[1].get("values") or [] for c in row)
+        if has_data:
+            # 서식까지 지우는 clear() 대신 데이터 영역(2행~)의 값만 비움
+            with_retry(lambda: self.sh.values_batch_clear(body={"ranges": ["'Failures'!A2:Z"]}))
+
+        # 헤더가 다를 때만 다시 작성
+        if not head or list(head[0][:5]) != header[0]:
+            with_retry(lambda: failures_ws.update(values=header, range_name="A1:E1"))
         print("[ INFO ] Failures sheet has been initialized.")
 
 
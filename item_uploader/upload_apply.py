@@ -2,16 +2,25 @@
 from __future__ import annotations
 
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-import gspread
-from gspread.utils import rowcol_to_a1
-import pandas as pd
+import numpy as np
 from zipfile import ZipFile as _ZipFile
 
+if TYPE_CHECKING:
+    import gspread
+
 # 프로젝트 공통 유틸
-from .utils_common import open_sheet_by_env, safe_worksheet, with_retry, get_env
+from .utils_common import open_sheet_by_env, ensure_worksheet, with_retry, get_env, invalidate_values
+
+# 파싱 경로에서 반복 사용하는 정규식 (모듈 로드 시 1회 컴파일)
+_RE_SHEETVIEWS = re.compile(r"<(?:\w+:)?sheetViews[\s\S]*?</(?:\w+:)?sheetViews>", re.IGNORECASE)
+_RE_PANE_SELF = re.compile(r"<(?:\w+:)?pane\b[^>]*/>", re.IGNORECASE)
+_RE_PANE_BLOCK = re.compile(r"<(?:\w+:)?pane\b[^>]*>[\s\S]*?</(?:\w+:)?pane>", re.IGNORECASE)
+_RE_LABEL = re.compile(r"^(et_title_|ps_)", re.IGNORECASE)
 
 # ------------------------------------------------------
 # 0) XLSX Sanitize: sheetViews / pane 제거 (네임스페이스 포함)
@@ -23,47 +32,44 @@ def _sanitize_xlsx_remove_sheetviews(bio: BytesIO) -> BytesIO:
     """
     bio.seek(0)
     raw = bio.read()
-    ib = BytesIO(raw)
-    ob = BytesIO()
-    modified = False
-
-    re_sheetviews_block = re.compile(r"<(?:\w+:)?sheetViews[\s\S]*?</(?:\w+:)?sheetViews>", re.IGNORECASE)
-    re_pane_self = re.compile(r"<(?:\w+:)?pane\b[^>]*/>", re.IGNORECASE)
-    re_pane_block = re.compile(r"<(?:\w+:)?pane\b[^>]*>[\s\S]*?</(?:\w+:)?pane>", re.IGNORECASE)
 
-    with _ZipFile(ib, "r") as zin, _ZipFile(ob, "w") as zout:
+    # 1) 워크시트 XML만 검사 → 바이트 프로브로 대상이 없으면 디코드/정규식 생략
+    patched: dict[str, bytes] = {}
+    with _ZipFile(BytesIO(raw), "r") as zin:
         for info in zin.infolist():
+            if not (info.filename.startswith("xl/worksheets/sheet") and info.filename.endswith(".xml")):
+                continue
             data = zin.read(info.filename)
-            if info.filename.startswith("xl/worksheets/sheet") and info.filename.endswith(".xml"):
-                text = data.decode("utf-8", errors="ignore")
-                new_text = re_sheetviews_block.sub("", text)
-                new_text = re_pane_self.sub("", new_text)
-                new_text = re_pane_block.sub("", new_text)
-                if new_text != text:
-                    modified = True
-                    data = new_text.encode("utf-8", errors="ignore")
-            zout.writestr(info, data)
-
-    if modified:
-        ob.seek(0)
-        return ob
-    return BytesIO(raw)
+            if b"sheetViews" not in data and b"pane" not in data:
+                continue
+            text = data.decode("utf-8", errors="ignore")
+            new_text = _RE_SHEETVIEWS.sub("", text)
+            new_text = _RE_PANE_SELF.sub("", new_text)
+            new_text = _RE_PANE_BLOCK.sub("", new_text)
+            if new_text != text:
+                patched[info.filename] = new_text.encode("utf-8", errors="ignore")
+
+        # 수정할 시트가 없으면 원본 그대로 (ZIP 재작성 없음)
+        if not patched:
+            return BytesIO(raw)
+
+        # 2) 변경된 시트만 교체, 나머지(이미지 등)는 원래 압축 방식 그대로 복사
+        ob = BytesIO()
+        with _ZipFile(ob, "w") as zout:
+            for info in zin.infolist():
+                data = patched.get(info.filename)
+                if data is None:
+                    data = zin.read(info.filename)
+                zout.writestr(info, data)
+
+    ob.seek(0)
+    return ob
 
 # ------------------------------------------------------
-# 1) 보이는 행(openpyxl) 우선 파서 + 숨김/높이0/아웃라인 숨김 제외
+# 1) openpyxl(read_only) 우선 파서
+#    - 행 구성은 pandas 전체 읽기와 동일: 앞/중간 빈 행 유지, 끝쪽 빈 행·빈 열만 제거
+#    - read_only 워크시트에는 row_dimensions가 없어 숨김 행도 그대로 포함됨 (pandas 경로와 동일)
 # ------------------------------------------------------
-def _is_row_hidden_extended(ws, r_idx: int) -> bool:
-    rd = ws.row_dimensions.get(r_idx)
-    if not rd:
-        return False
-    if getattr(rd, "hidden", False):
-        return True
-    if getattr(rd, "height", None) == 0:
-        return True
-    if getattr(rd, "outlineLevel", 0) > 0 and getattr(rd, "hidden", False):
-        return True
-    return False
-
 def _read_with_openpyxl_visible_only(file_bytes: bytes) -> List[List[str]]:
     from openpyxl import load_workbook
 
@@ -71,83 +77,119 @@ def _read_with_openpyxl_visible_only(file_bytes: bytes) -> List[List[str]]:
     # 데이터가 가장 많은 시트를 선택
     target = max(wb.worksheets, key=lambda s: (s.max_row or 0) * (s.max_column or 0))
 
-    max_r = target.max_row or 0
-    max_c = target.max_column or 0
-    if max_r == 0 or max_c == 0:
-        return []
-
+    # 단일 패스: max_row/max_column 선계산 없이 스트리밍으로 읽고 최대 열 수를 누적
     rows: List[List[str]] = []
-    for r_idx, row in enumerate(
-        target.iter_rows(min_row=1, max_row=max_r, min_col=1, max_col=max_c, values_only=True),
-        start=1,
-    ):
-        if _is_row_hidden_extended(target, r_idx):
-            continue  # 숨김 행 제외
-
-        arr = [("" if v is None else str(v).strip()) for v in (row or ())]
+    max_len = 0
+    last_data = 0  # 마지막 비어 있지 않은 행까지의 길이
+    for row in target.iter_rows(values_only=True):
+        # read_only 행은 max_column까지 None으로 채워짐 → 문자열화 전에 꼬리 None부터 잘라냄
+        row = row or ()
+        n = len(row)
+        while n and row[n - 1] is None:
+            n -= 1
+        # 대부분 str/None → 타입 분기 1회로 처리 (str 호출 최소화)
+        arr = [v.strip() if v.__class__ is str else ("" if v is None else str(v).strip()) for v in row[:n]]
         while arr and arr[-1] == "":
             arr.pop()
-        if any(arr):
-            rows.append(arr)
-
-    max_len = max((len(r) for r in rows), default=0)
-    rows = [r + [""] * (max_len - len(r)) for r in rows]
+        # 빈 행도 자리를 유지 (데이터 중간의 빈 행이 빠지면 행 위치가 어긋남)
+        rows.append(arr)
+        if arr:
+            last_data = len(rows)
+            if len(arr) > max_len:
+                max_len = len(arr)
+
+    del rows[last_data:]  # 끝쪽 빈 행만 제거
+    for arr in rows:
+        if len(arr) < max_len:
+            arr.extend([""] * (max_len - len(arr)))
     return rows
 
 # ------------------------------------------------------
-# 2) pandas 폴백: 전체 행 읽기 (FutureWarning 제거 버전)
+# 2) 폴백: 전체 행 읽기 (calamine 우선, 미설치 시 pandas)
 # ------------------------------------------------------
+def _cell_to_str(v) -> str:
+    if v is None or v == "":
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))  # 1.0 → "1" (pandas 경로와 동일 표기)
+    return str(v).strip()
+
+def _trim_empty_edges(rows) -> List[List[str]]:
+    """오른쪽 빈 열 / 아래쪽 빈 행을 numpy 마스크로 한 번에 제거 (list 또는 2D 배열)."""
+    if len(rows) == 0:
+        return []
+    arr = np.asarray(rows, dtype=object)
+    filled = arr != ""
+    used_rows = np.flatnonzero(filled.any(axis=1))
+    used_cols = np.flatnonzero(filled.any(axis=0))
+    if used_rows.size == 0:
+        return []
+    return arr[: used_rows[-1] + 1, : used_cols[-1] + 1].tolist()
+
+def _read_with_calamine_all_rows(file_bytes: bytes) -> Optional[List[List[str]]]:
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        return None  # 미설치 → pandas 폴백
+    wb = CalamineWorkbook.from_filelike(BytesIO(file_bytes))
+    raw = wb.get_sheet_by_index(0).to_python()
+    width = max((len(r) for r in raw), default=0)
+    rows = [[_cell_to_str(v) for v in r] + [""] * (width - len(r)) for r in raw]
+    return _trim_empty_edges(rows)
+
 def _read_with_pandas_all_rows(file_bytes: bytes) -> List[List[str]]:
     try:
-        df = pd.read_excel(BytesIO(file_bytes), engine="openpyxl", header=None, dtype=str)
+        rows = _read_with_calamine_all_rows(file_bytes)
+        if rows is not None:
+            return rows
     except Exception:
-        return []
-    # applymap → Series.map(경고 제거)
-    df = df.apply(lambda s: s.map(lambda x: "" if pd.isna(x) else str(x).strip()))
+        pass  # calamine 파싱 실패 → 기존 openpyxl 엔진으로 재시도
 
-    # 오른쪽 빈 열 / 아래쪽 빈 행 제거
-    while df.shape[1] > 0 and (df.iloc[:, -1] == "").all():
-        df = df.iloc[:, :-1]
-    while df.shape[0] > 0 and (df.iloc[-1, :] == "").all():
-        df = df.iloc[:-1, :]
+    import pandas as pd  # 폴백 경로에서만 사용 → import 지연
 
-    return df.values.tolist()
+    try:
+        df = pd.read_excel(BytesIO(file_bytes), engine="openpyxl", header=None, dtype=str)
+    except Exception:
+        return []
+    if df.empty:
+        return []
+    # dtype=str → 값은 str 또는 NaN. np.char는 고정폭 유니코드 배열을 만들어
+    # 긴 설명 셀 하나에 전체 메모리가 비례하므로 object 그대로 strip
+    rows = [[c.strip() for c in r] for r in df.fillna("").to_numpy(dtype=object).tolist()]
+    return _trim_empty_edges(rows)
 
 # ------------------------------------------------------
 # 3) Shopee 상단 라벨/메타 행 제거
 # ------------------------------------------------------
+_META_FIRST_CELLS = frozenset({"basic_info", "media_info", "sales_info"})
+
+# 셀은 리더 단계에서 이미 str + strip 완료 → 여기서는 소문자 비교만
+def _is_meta_row(row: list[str]) -> bool:
+    if row and (row[0] or "").lower() in _META_FIRST_CELLS:
+        return True
+    return any("search_condition" in c.lower() for c in row if c)
+
+def _is_label_row(row: list[str]) -> bool:
+    r = [c.lower() for c in row if c]
+    if not r:
+        return False
+    label_like = sum(1 for c in r if _RE_LABEL.match(c) or "ps_item_image" in c or "option_" in c or "option." in c)
+    return label_like / len(r) >= 0.6
+
 def _strip_shopee_meta_rows(values: list[list[str]]) -> list[list[str]]:
     if not values:
         return values
 
-    def norm_row(row: list[str]) -> list[str]:
-        return [str(c or "").strip() for c in row]
-
-    def is_meta_row(row: list[str]) -> bool:
-        r = norm_row(row)
-        first = (r[0].lower() if r else "")
-        if first in {"basic_info", "media_info", "sales_info"}:
-            return True
-        return any("search_condition" in c.lower() for c in r if c)
-
-    label_pat = re.compile(r"^(et_title_|ps_)", re.IGNORECASE)
-
-    def is_label_row(row: list[str]) -> bool:
-        r = [c.lower() for c in norm_row(row) if c]
-        if not r:
-            return False
-        label_like = sum(1 for c in r if label_pat.match(c) or "ps_item_image" in c or "option_" in c or "option." in c)
-        ratio = label_like / max(1, len(r))
-        return ratio >= 0.6
-
-    v = values[:]
-    while v and is_label_row(v[0]):
-        v = v[1:]
-    if v and is_meta_row(v[0]):
-        v = v[1:]
-    elif len(v) >= 2 and is_meta_row(v[1]):
-        v = [v[0]] + v[2:]
-    return v
+    # 상단 몇 행만 검사: 라벨 행 수를 세고 마지막에 1회만 슬라이스 (행마다 리스트 복사 방지)
+    n = len(values)
+    start = 0
+    while start < n and _is_label_row(values[start]):
+        start += 1
+    if start < n and _is_meta_row(values[start]):
+        return values[start + 1:]
+    if n - start >= 2 and _is_meta_row(values[start + 1]):
+        return [values[start]] + values[start + 2:]
+    return values[start:] if start else values
 
 # ------------------------------------------------------
 # 4) 최종 파서
@@ -183,26 +225,31 @@ def _write_values_to_sheet(sh: gspread.Spreadsheet, tab: str, values: List[List]
         logs.append(f"[WARN] {tab}: 입력 데이터가 비어 있어 skip")
         return
 
-    try:
-        ws = safe_worksheet(sh, tab)
-        with_retry(lambda: ws.clear())
-    except Exception:
-        ws = with_retry(lambda: sh.add_worksheet(title=tab, rows=max(rows + 10, 100), cols=max(cols + 5, 26)))
-
-    if ws.row_count < rows or ws.col_count < cols:
-        with_retry(lambda: ws.resize(rows=rows + 10, cols=cols + 5))
+    # clear 호출 대신: 그리드를 데이터 크기에 정확히 맞추고(축소 시 범위 밖 옛 값은 잘려 나감)
+    # 범위 안은 모든 셀을 RAW로 덮어쓴다 (resize 1회 + values 쓰기 1회)
+    # ws는 TTL 캐시 항목일 수 있어 row_count/col_count가 실제와 다를 수 있음 → 비교 없이 항상 resize
+    ws = ensure_worksheet(sh, tab, rows=rows, cols=cols)
+    with_retry(lambda: ws.resize(rows=rows, cols=cols))
+    if any(len(r) < cols for r in values):
+        values = [r + [""] * (cols - len(r)) if len(r) < cols else r for r in values]
 
+    # 청크를 여러 range로 묶어 values:batchUpdate 1회로 전송 (청크 미설정 시 range 1개)
+    # 경계는 미리 확정해 body에 고정 → 재시도 시에도 같은 슬라이스, 단일 청크면 복사 없이 원본 전달
     chunk_rows = int(get_env("UPLOAD_CHUNK_ROWS", "0") or "0")
-    if chunk_rows > 0:
-        start = 0
-        while start < rows:
-            end = min(rows, start + chunk_rows)
-            start_a1 = rowcol_to_a1(start + 1, 1)
-            with_retry(lambda: ws.update(start_a1, values[start:end], raw=True))
-            start = end
-    else:
-        end_a1 = rowcol_to_a1(rows, cols)
-        with_retry(lambda: ws.update(f"A1:{end_a1}", values, raw=True))
+    step = chunk_rows if 0 < chunk_rows < rows else rows
+    # 시작 열은 항상 A → rowcol_to_a1 없이 "A{행}" 문자열로 조합, 탭 이름 인용은 1회만
+    sheet_ref = "'" + tab.replace("'", "''") + "'"
+    data = [
+        {
+            "range": f"{sheet_ref}!A{start + 1}",
+            "majorDimension": "ROWS",
+            "values": values if step == rows else values[start:start + step],
+        }
+        for start in range(0, rows, step)
+    ]
+    # values_batch_update(params, body): 페이로드는 body= 로 전달 (위치 인자는 쿼리 파라미터로 나감)
+    with_retry(partial(sh.values_batch_update, body={"valueInputOption": "RAW", "data": data}))
+    invalidate_values(tab)
 
     logs.append(f"[OK] {tab}: {rows}x{cols} 적용 완료")
 
@@ -219,6 +266,30 @@ def _target_tab(filename: str) -> Optional[str]:
 # ------------------------------------------------------
 # 7) 업로드 반영 엔트리
 # ------------------------------------------------------
+def _process_one(sh, fname: str, raw: BytesIO) -> List[str]:
+    """업로드 파일 1개 처리(읽기 → 탭 반영). 결과 로그 목록을 반환."""
+    logs: List[str] = []
+    tab = _target_tab(fname)
+    if not tab:
+        logs.append(f"[SKIP] 파일명 규칙 불일치: {fname}")
+        return logs
+
+    try:
+        raw.seek(0)
+        values = read_xlsx_values(raw)
+    except Exception as e:
+        logs.append(f"[ERROR] {tab}: {fname} 읽기 실패 → {e}")
+        return logs
+
+    if len(values) <= 1 and (len(values[0]) if values else 0) <= 1:
+        logs.append(f"[WARN] {tab}: 데이터가 비정상적으로 작습니다. (shape={len(values)}x{len(values[0]) if values else 0})")
+
+    try:
+        _write_values_to_sheet(sh, tab, values, logs)
+    except Exception as e:
+        logs.append(f"[ERROR] {tab}: {fname} 반영 실패 → {e}")
+    return logs
+
 def apply_uploaded_files(files: dict[str, BytesIO]) -> list[str]:
     """
     Streamlit에서 업로드된 {filename: BytesIO}를 받아
@@ -230,26 +301,11 @@ def apply_uploaded_files(files: dict[str, BytesIO]) -> list[str]:
 
     sh = open_sheet_by_env()
 
-    for fname, raw in files.items():
-        tab = _target_tab(fname)
-        if not tab:
-            logs.append(f"[SKIP] 파일명 규칙 불일치: {fname}")
-            continue
-
-        try:
-            raw.seek(0)
-            values = read_xlsx_values(raw)
-        except Exception as e:
-            logs.append(f"[ERROR] {tab}: {fname} 읽기 실패 → {e}")
-            continue
-
-        if len(values) <= 1 and (len(values[0]) if values else 0) <= 1:
-            logs.append(f"[WARN] {tab}: 데이터가 비정상적으로 작습니다. (shape={len(values)}x{len(values[0]) if values else 0})")
-
-        try:
-            _write_values_to_sheet(sh, tab, values, logs)
-        except Exception as e:
-            logs.append(f"[ERROR] {tab}: {fname} 반영 실패 → {e}")
+    # 파일별로 대상 탭이 달라 서로 독립 → 파싱/쓰기를 병렬로 겹친다 (로그는 입력 순서대로 병합)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(_process_one, sh, fname, raw) for fname, raw in files.items()]
+        for fut in futures:
+            logs.extend(fut.result())
 
     if not any(x.startswith("[OK]") for x in logs):
         logs.append("[WARN] 적용된 탭이 없습니다. 파일명 규칙/시트 권한을 확인하세요.")
@@ -4,51 +4,107 @@ utils_common.py (Streamlit Secrets + Service Account 우선, OAuth 파일 fallba
 
 - 환경/Secrets 로딩 (Secrets 우선)
 - gspread 인증 (서비스계정 권장, 로컬 OAuth 폴백)
-- 문자열/헤더 정규화 유틸
+- 문자열/헤더 정규화 유틸 (shared.text에서 re-export)
 - Google Sheets 접근 유틸 (429 완화: 지수 백오프 + 워크시트 캐시)
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
+import tempfile
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Callable
+from typing import TYPE_CHECKING, Optional, List, Dict, Callable
 
-import gspread
-from gspread.exceptions import WorksheetNotFound
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Streamlit / Google Auth (서비스계정)
+if TYPE_CHECKING:
+    import gspread
+
+# Streamlit (cache_resource 데코레이터가 import 시점에 필요 → 즉시 로드)
 try:
     import streamlit as st
-    from google.oauth2.service_account import Credentials
 except Exception:  # 로컬 스크립트 실행 등
     st = None  # type: ignore
-    Credentials = None  # type: ignore
+
+# 응답 JSON 디코드 가속 훅 (shopee_creator와 공용, orjson 미설치 시 no-op)
+from shared.fast_json import install_fast_json
+
+# gspread / google.oauth2 는 무거우므로(각 0.1~0.2s) 첫 인증 시점까지 import 지연
+@lru_cache(maxsize=None)
+def _gspread():
+    import gspread
+    return gspread
 
 # =============================
 # 환경 변수 & .env 로딩
 # =============================
-def load_env():
-    """여러 위치에서 .env 탐색하여 로드 (로컬 개발용)"""
+_ENV_LOADED = False
+_ENV_FILE_STATE: Optional[tuple] = None  # (로드한 .env 경로, mtime)
+
+def _file_mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return -1.0
+
+def load_env(force: bool = False):
+    """
+    여러 위치에서 .env 탐색하여 로드 (로컬 개발용). 탐색은 프로세스당 1회,
+    이후 호출은 로드한 .env의 mtime만(os.stat 1회) 확인해 외부에서 바뀐 경우에만 재로딩.
+    force=True면 무조건 재로딩.
+    """
+    global _ENV_LOADED, _ENV_FILE_STATE
+    if _ENV_LOADED and not force:
+        if _ENV_FILE_STATE is None or _file_mtime(_ENV_FILE_STATE[0]) == _ENV_FILE_STATE[1]:
+            return
     base = Path(__file__).resolve().parent
     for p in [base / ".env", base.parent / ".env", Path.cwd() / ".env"]:
         if p.exists():
             load_dotenv(p, override=True)
-            return
-    load_dotenv(override=True)  # fallback
+            _ENV_FILE_STATE = (str(p), _file_mtime(str(p)))
+            break
+    else:
+        load_dotenv(override=True)  # fallback
+        _ENV_FILE_STATE = None
+    _ENV_LOADED = True
+    clear_ss_id_cache()
+
+# st.secrets 최상위 스칼라 값 스냅샷. secrets.toml이 없으면 st.secrets.get()이 매번 파일 탐색 후
+# 예외를 던지므로(~90us/회) get_env 반복 호출 시 1회 변환한 dict만 조회. 파일 수정은 TTL 후 반영.
+_SECRETS_CACHE: TTLCache = TTLCache(maxsize=1, ttl=60)
+_SECRETS_LOCK = threading.Lock()
+
+def _secrets_snapshot() -> Dict[str, str]:
+    with _SECRETS_LOCK:
+        snap = _SECRETS_CACHE.get("top")
+        if snap is None:
+            snap = {}
+            if st is not None and hasattr(st, "secrets"):
+                try:
+                    snap = {
+                        k: str(v).strip()
+                        for k, v in st.secrets.items()
+                        if v is not None and not hasattr(v, "keys")  # [섹션]은 get_env 대상 아님
+                    }
+                except Exception:
+                    snap = {}
+            _SECRETS_CACHE["top"] = snap
+        return snap
 
 def _get_from_secrets(name: str) -> str:
-    if st is not None and hasattr(st, "secrets"):
-        try:
-            val = st.secrets.get(name, "")
-            return (str(val) if val is not None else "").strip()
-        except Exception:
-            return ""
-    return ""
+    return _secrets_snapshot().get(name, "")
 
 def get_env(name: str, default: str = "") -> str:
     """Cloud에선 Secrets 우선 → 없으면 OS/.env"""
@@ -72,11 +128,17 @@ def _env_path() -> str:
     p1 = here / ".env"
     return str(p1 if p1.exists() else Path.cwd() / ".env")
 
-def save_env_value(key: str, value: str):
-    """단순 .env 업데이트: 키 있으면 교체, 없으면 추가 (로컬에서만 사용)"""
-    path = _env_path()
+# 파싱한 .env 내용 (경로 → (mtime, kv)). 저장 때마다 파일을 다시 읽어 파싱하지 않음
+_ENV_KV: Dict[str, tuple] = {}
+
+def _read_env_file(path: str) -> Dict[str, str]:
+    """.env 파싱 결과 (mtime이 같으면 메모리 사본 재사용, 호출자가 수정해도 되도록 복사본 반환)"""
+    mtime = _file_mtime(path)
+    hit = _ENV_KV.get(path)
+    if hit is not None and hit[0] == mtime:
+        return dict(hit[1])
     kv: Dict[str, str] = {}
-    if Path(path).exists():
+    if mtime >= 0:
         with open(path, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.rstrip("\n")
@@ -85,21 +147,109 @@ def save_env_value(key: str, value: str):
                 if "=" in line:
                     k, v = line.split("=", 1)
                     kv[k.strip()] = v.strip()
-    kv[key] = value
+    _ENV_KV[path] = (mtime, kv)
+    return dict(kv)
+
+def _write_env_file(path: str, kv: Dict[str, str]):
+    """임시 파일에 쓴 뒤 os.replace로 교체 (중간에 죽어도 .env가 잘린 채 남지 않음)."""
     lines = [f"{k}={v}" for k, v in kv.items()]
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
+    # 같은 프로세스의 여러 세션이 동시에 써도 겹치지 않도록 고유한 임시 파일명 사용
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".env.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _ENV_KV[path] = (_file_mtime(path), dict(kv))
+    _mark_env_written(path)
+
+def _mark_env_written(path: str):
+    """
+    직접 쓴 변경은 os.environ에 이미 반영 → load_env가 mtime 변화로 재로딩하지 않도록 기록 갱신.
+    로드 시점에 .env가 없었다면(감시 대상 없음) 새로 만든 파일을 감시 대상으로 등록.
+    """
+    global _ENV_FILE_STATE
+    if _ENV_FILE_STATE is None or _ENV_FILE_STATE[0] == str(path):
+        _ENV_FILE_STATE = (str(path), _file_mtime(str(path)))
+
+def save_env_values(mapping: Dict[str, str]):
+    """여러 키를 한 번에 .env에 반영 (파싱/병합/쓰기 1회, 로컬에서만 사용)"""
+    if not mapping:
+        return
+    path = _env_path()
+    kv = _read_env_file(path)
+    # 같은 값으로 다시 저장하는 경우(설정 폼 재제출 등)는 파일 재작성 생략
+    if any(kv.get(k) != str(v) for k, v in mapping.items()):
+        kv.update(mapping)
+        _write_env_file(path, kv)
+    # load_env()는 1회만 로드하므로 현재 프로세스 ENV에도 즉시 반영
+    os.environ.update({k: str(v) for k, v in mapping.items()})
+    clear_ss_id_cache()
+
+def save_env_value(key: str, value: str):
+    """단순 .env 업데이트: 키 있으면 교체(전체 재작성), 없으면 끝에 한 줄 추가 (로컬에서만 사용)"""
+    path = _env_path()
+    kv = _read_env_file(path)
+    os.environ[key] = str(value)
+    clear_ss_id_cache()
+    if key in kv:
+        kv[key] = value
+        _write_env_file(path, kv)
+        return
+    line = f"{key}={value}\n".encode("utf-8")
+    with open(path, "ab+") as f:
+        # 마지막 줄이 개행으로 끝나지 않으면 보정
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        f.write(line)
+    _ENV_KV.pop(path, None)
+    _mark_env_written(path)
 
 # =============================
 # 공통 유틸
 # =============================
 # 워크시트 캐시 (동일 시트/탭 반복 접근 시 Read 요청 절약)
-_WS_CACHE: dict[tuple[str, str], gspread.Worksheet] = {}
+# 장시간 세션에서 외부 삭제된 탭이 영구히 남지 않도록 TTL + 크기 제한
+_WS_CACHE: TTLCache = TTLCache(maxsize=256, ttl=600)
 
 def _ws_cache_key(sh, name: str):
     sid = getattr(sh, "id", None) or getattr(sh, "spreadsheet_id", None) or ""
     return (sid, name)
 
+_RE_RETRY_IN = re.compile(r"retry in\s+(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+def _server_retry_hint(e: Exception) -> Optional[float]:
+    """서버가 알려준 재시도 대기(초): Retry-After 헤더 → 'Please retry in Xs' 본문 순."""
+    resp = getattr(e, "response", None)
+    headers = getattr(resp, "headers", None) or {}
+    try:
+        ra = headers.get("Retry-After")
+    except Exception:
+        ra = None
+    if ra:
+        try:
+            return max(0.0, float(ra))
+        except (TypeError, ValueError):
+            pass  # HTTP-date 형식은 무시
+    m = _RE_RETRY_IN.search(str(e))
+    if m:
+        return float(m.group(1))
+    return None
+
+# 응답 객체 없이 올라오는 결정적 오류 (탭/시트 없음) → 재시도 무의미
+_NO_RETRY_ERRORS = frozenset({"WorksheetNotFound", "SpreadsheetNotFound"})
+# 호출 코드의 버그(잘못된 인자/속성 등) → 재시도해도 같은 결과, 즉시 재전파
+_PROGRAMMING_ERRORS = (TypeError, AttributeError, NameError, KeyError, IndexError)
+
 def with_retry(
     fn: Callable,
     retries: int = 6,
@@ -108,7 +258,10 @@ def with_retry(
     jitter: float = 0.3,
 ):
     """
-    gspread 호출용 재시도. 429면 지수 백오프(+지터)로 재시도.
+    gspread 호출용 재시도 (지수 백오프 + 지터).
+    - 429: 서버 힌트(Retry-After 등)와 백오프 중 긴 쪽만큼 대기
+    - 5xx/네트워크 오류: 지수 백오프
+    - 그 외 4xx(권한/요청 오류)·탭 없음·TypeError 등 코드 오류: 재시도해도 같은 결과 → 즉시 재전파
     """
     last_err = None
     for i in range(retries):
@@ -116,11 +269,21 @@ def with_retry(
             return fn()
         except Exception as e:
             last_err = e
+            if isinstance(e, _PROGRAMMING_ERRORS) or type(e).__name__ in _NO_RETRY_ERRORS:
+                raise
             status = getattr(getattr(e, "response", None), "status_code", None)
             if status is None and "429" in str(e):
                 status = 429
-            sleep_s = delay * (backoff ** i) + random.uniform(0, jitter)
-            time.sleep(sleep_s if status == 429 else delay)
+            if status is not None and 400 <= status < 500 and status != 429:
+                raise
+            if i == retries - 1:
+                break
+            wait = delay * (backoff ** i) + random.uniform(0, jitter)
+            if status == 429:
+                hint = _server_retry_hint(e)
+                if hint is not None:
+                    wait = max(wait, hint)
+            time.sleep(wait)
     if last_err:
         raise last_err
 
@@ -130,63 +293,105 @@ def safe_worksheet(sh, name: str):
     key = _ws_cache_key(sh, name)
     if key in _WS_CACHE:
         return _WS_CACHE[key]
-    ws = with_retry(lambda: sh.worksheet(name))
+    try:
+        ws = with_retry(lambda: sh.worksheet(name))
+    except _gspread().exceptions.WorksheetNotFound:
+        # 오래된 항목 정리 후 재전파 → 다음 호출은 깨끗하게 다시 채움
+        _WS_CACHE.pop(key, None)
+        titles = _WS_LIST_CACHE.get(key[0])
+        if titles is not None:
+            titles.pop(name, None)
+        raise
     _WS_CACHE[key] = ws
     return ws
 
-# 문자열/헤더 정규화
-def norm(s: str) -> str:
-    return (
-        str(s or "")
-        .strip()
-        .lower()
-        .replace("\u00a0", " ")
-        .replace("\u200b", "")
-        .replace("\u200c", "")
-        .replace("\u200d", "")
-    )
+# 스프레드시트별 탭 목록 캐시 (title → Worksheet). 존재 여부를 로컬에서 판단해
+# worksheet() 탐색 실패(+재시도) 후 add_worksheet 하는 왕복을 없앤다.
+_WS_LIST_CACHE: TTLCache = TTLCache(maxsize=64, ttl=600)
+# TTLCache는 스레드 안전하지 않음 → 병렬 업로드 시 조회/생성 구간 직렬화
+_WS_LOCK = threading.RLock()
 
-def header_key(s: str) -> str:
-    """헤더 비교용: 영숫자+하이픈만 남김"""
-    return re.sub(r"[^a-z0-9\-]+", "", norm(s))
-
-def hex_to_rgb01(hex_str: str) -> Dict[str, float]:
-    """#RRGGBB → {red,green,blue} (0~1 float)"""
-    hex_str = hex_str.lstrip("#")
-    if len(hex_str) != 6:
-        return {"red": 1, "green": 1, "blue": 0.7}
-    r, g, b = tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
-    return {"red": r / 255.0, "green": g / 255.0, "blue": b / 255.0}
-
-def extract_sheet_id(s: str) -> str | None:
-    s = (s or "").strip()
-    if re.fullmatch(r"[A-Za-z0-9\-_]{25,}", s):
-        return s
-    m = re.search(r"/spreadsheets/d/([A-Za-z0-9\-_]+)", s)
-    if m:
-        return m.group(1)
-    return None
+def _ws_titles(sh) -> dict[str, gspread.Worksheet]:
+    sid = _ws_cache_key(sh, "")[0]
+    titles = _WS_LIST_CACHE.get(sid)
+    if titles is None:
+        titles = {ws.title: ws for ws in with_retry(lambda: sh.worksheets())}
+        _WS_LIST_CACHE[sid] = titles
+    return titles
 
-def sheet_link(sid: str) -> str:
-    return f"https://docs.google.com/spreadsheets/d/{sid}/edit"
+def ensure_worksheet(sh, name: str, rows: int = 1000, cols: int = 26):
+    """탭이 있으면 반환, 없으면 생성 (탭 목록 1회 조회 후 로컬 판단)."""
+    if not sh:
+        raise ValueError(f"Spreadsheet object is not valid. Cannot get worksheet '{name}'.")
+    key = _ws_cache_key(sh, name)
+    with _WS_LOCK:
+        ws = _WS_CACHE.get(key)
+        if ws is not None:
+            return ws
+        titles = _ws_titles(sh)
+        ws = titles.get(name)
+        if ws is None:
+            ws = with_retry(lambda: sh.add_worksheet(title=name, rows=rows, cols=cols))
+            titles[name] = ws
+        _WS_CACHE[key] = ws
+        return ws
 
-def strip_category_id(cat: str) -> str:
-    """'101814 - Home & Living/...' -> 'Home & Living/...'"""
-    s = str(cat or "")
-    m = re.match(r"^\s*\d+\s*-\s*(.+)$", s)
-    return m.group(1) if m else s
+# 값 읽기 캐시: (sheet_id, tab, range, 옵션) → 2D 값. Step 1~7 사이 같은 입력/레퍼런스 탭을
+# 반복 조회할 때 values.get 왕복 절약. 쓰기 경로는 invalidate_values(tab)로 즉시 무효화.
+_VALUES_CACHE: TTLCache = TTLCache(maxsize=128, ttl=30)
+_VALUES_LOCK = threading.Lock()
 
-def top_of_category(cat: str) -> Optional[str]:
-    """TopLevel 추출"""
-    if not cat:
-        return None
-    tail = strip_category_id(cat)
-    for sep in ["/", ">", "|", "\\"]:
-        if sep in tail:
-            tail = tail.split(sep, 1)[0]
-            break
-    tail = tail.strip()
-    return tail.lower() if tail else None
+def fetch_values(ws, a1: Optional[str] = None, **kwargs) -> List[List]:
+    """ws.get_all_values() / ws.get_values(a1, ...) 결과를 짧은 TTL로 캐시해 반환 (행은 복사본)."""
+    sid = _ws_cache_key(ws.spreadsheet, "")[0]
+    key = (sid, ws.title, a1, tuple(sorted(kwargs.items())))
+    with _VALUES_LOCK:
+        vals = _VALUES_CACHE.get(key)
+    if vals is None:
+        if a1 is None and not kwargs:
+            vals = with_retry(lambda: ws.get_all_values()) or []
+        else:
+            vals = with_retry(lambda: ws.get_values(a1, **kwargs)) or []
+        with _VALUES_LOCK:
+            _VALUES_CACHE[key] = vals
+    # 호출부가 행을 수정해도 캐시가 오염되지 않도록 행 단위 복사
+    return [list(r) for r in vals]
+
+def fetch_values_batch(wss: List[gspread.Worksheet]) -> List[List[List]]:
+    """
+    같은 스프레드시트의 여러 탭 전체 값을 values.batchGet 1회로 읽어 순서대로 반환.
+    fetch_values(ws)와 같은 캐시 키를 공유하므로 이미 읽은 탭은 요청에서 제외된다.
+    """
+    if not wss:
+        return []
+    sid = _ws_cache_key(wss[0].spreadsheet, "")[0]
+    keys = [(sid, ws.title, None, ()) for ws in wss]
+    with _VALUES_LOCK:
+        found = {k: _VALUES_CACHE.get(k) for k in keys}
+    missing = [ws for ws, k in zip(wss, keys) if found[k] is None]
+    if missing:
+        ranges = ["'" + ws.title.replace("'", "''") + "'" for ws in missing]
+        resp = with_retry(lambda: missing[0].spreadsheet.values_batch_get(ranges)) or {}
+        value_ranges = resp.get("valueRanges", [])
+        with _VALUES_LOCK:
+            for ws, vr in zip(missing, value_ranges):
+                # get_all_values()와 동일하게 직사각형으로 패딩
+                vals = _gspread().utils.fill_gaps(vr.get("values", []))
+                found[(sid, ws.title, None, ())] = vals
+                _VALUES_CACHE[(sid, ws.title, None, ())] = vals
+    return [[list(r) for r in (found[k] or [])] for k in keys]
+
+def invalidate_values(tab: str, sheet_id: Optional[str] = None):
+    """tab(및 선택적 sheet_id)에 해당하는 읽기 캐시 항목 제거."""
+    with _VALUES_LOCK:
+        for key in [k for k in _VALUES_CACHE.keys() if k[1] == tab and (sheet_id is None or k[0] == sheet_id)]:
+            _VALUES_CACHE.pop(key, None)
+
+# 문자열/헤더 유틸 (무거운 의존성 없는 shared.text로 분리, 기존 경로 호환용 re-export)
+from shared.text import (  # noqa: E402,F401
+    norm, header_key, hex_to_rgb01, extract_sheet_id, sheet_link, is_http_url,
+    strip_category_id, top_of_category,
+)
 
 def get_tem_sheet_name() -> str:
     return get_env("TEM_OUTPUT_SHEET_NAME", "TEM_OUTPUT")
@@ -194,48 +399,238 @@ def get_tem_sheet_name() -> str:
 # =============================
 # Google Sheets 인증/열기
 # =============================
+# 서비스계정 액세스 토큰 캐시. 기본은 프로세스 메모리에만 보관 (만료 5분 전까지 JWT 서명 + 토큰 교환 왕복 생략).
+# 디스크 캐시는 GSPREAD_TOKEN_DISK_CACHE=1 로 명시했을 때만 (공유 호스트에 bearer 토큰을 남기지 않도록),
+# 파일/폴더는 소유자 전용 권한(0600/0700)으로 생성.
+_TOKEN_CACHE_PATH = Path("~/.cache/shopee_dev/token.json").expanduser()
+_TOKEN_MARGIN = timedelta(minutes=5)
+_TOKEN_MEMO: Dict[str, dict] = {}
+_TOKEN_LOCK = threading.Lock()
+
+def _token_disk_cache_enabled() -> bool:
+    return get_bool_env("GSPREAD_TOKEN_DISK_CACHE", False)
+
+def _as_utc(dt: datetime) -> datetime:
+    """google-auth의 expiry는 naive UTC → 비교용 aware UTC로 변환."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _load_cached_token(key: str) -> Optional[dict]:
+    with _TOKEN_LOCK:
+        entry = _TOKEN_MEMO.get(key)
+        if entry is None and _token_disk_cache_enabled():
+            try:
+                entry = json.loads(_TOKEN_CACHE_PATH.read_text(encoding="utf-8")).get(key)
+            except Exception:
+                entry = None
+        if not entry:
+            return None
+        try:
+            expiry = _as_utc(datetime.fromisoformat(entry["expiry"]))
+        except Exception:
+            return None
+        if expiry - _TOKEN_MARGIN <= datetime.now(timezone.utc):
+            return None
+        _TOKEN_MEMO[key] = entry
+        # Credentials.expiry는 google-auth 규약대로 naive UTC로 돌려줌
+        return {"token": entry["token"], "expiry": expiry.replace(tzinfo=None)}
+
+def _write_token_file(data: dict):
+    """소유자 전용 권한으로 임시 파일 생성 후 os.replace (권한이 열린 순간이 없도록)."""
+    _TOKEN_CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # mkstemp: 고유 이름 + 0600으로 생성 → 세션 간 임시 파일 충돌 없음
+    fd, tmp = tempfile.mkstemp(dir=_TOKEN_CACHE_PATH.parent, prefix=_TOKEN_CACHE_PATH.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data))
+        os.replace(tmp, _TOKEN_CACHE_PATH)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _store_cached_token(key: str, token: str, expiry: Optional[datetime]):
+    if not token or expiry is None:
+        return
+    entry = {"token": token, "expiry": _as_utc(expiry).isoformat()}
+    with _TOKEN_LOCK:
+        _TOKEN_MEMO[key] = entry
+        if not _token_disk_cache_enabled():
+            return
+        try:
+            try:
+                data = json.loads(_TOKEN_CACHE_PATH.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            data[key] = entry
+            _write_token_file(data)
+        except OSError:
+            pass  # 디스크 캐시는 best-effort (읽기 전용 FS 등)
+
+@lru_cache(maxsize=None)
+def _cached_credentials_cls():
+    """google-auth 서비스계정 Credentials 서브클래스 (지연 import, 미설치 시 None)."""
+    try:
+        from google.oauth2.service_account import Credentials
+    except Exception:
+        return None
+
+    class CachedCredentials(Credentials):
+        """refresh() 전에 캐시된 토큰을 먼저 확인하고, 실제 갱신 후에는 캐시에 저장."""
+
+        def _token_cache_key(self) -> str:
+            return f"{self.service_account_email}|{' '.join(sorted(self.scopes or ()))}"
+
+        def refresh(self, request):
+            key = self._token_cache_key()
+            cached = _load_cached_token(key)
+            if cached:
+                self.token, self.expiry = cached["token"], cached["expiry"]
+                return
+            super().refresh(request)
+            _store_cached_token(key, self.token, self.expiry)
+
+    return CachedCredentials
+
+_SA_SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+)
+
+# 서비스계정 Credentials (PEM 키 파싱은 1회만, 만료 토큰은 세션이 제자리에서 refresh)
+_SA_CREDS: Dict[str, object] = {}
+_SA_CREDS_LOCK = threading.Lock()
+
 def _authorize_gspread_via_service_account():
     """Streamlit Secrets의 서비스계정으로 인증 (권장 경로)."""
-    if st is None or Credentials is None:
+    creds_cls = _cached_credentials_cls()
+    if st is None or creds_cls is None:
         return None  # Streamlit/Google libs 미존재 → fallback 시도
     if not hasattr(st, "secrets"):
         return None
     if "gcp_service_account" not in st.secrets:
         return None
-    sa_info = dict(st.secrets["gcp_service_account"])
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_info(sa_info, scopes=scopes)
-    return gspread.authorize(creds)
+    sa_info = st.secrets["gcp_service_account"]  # Mapping 그대로 사용 (PEM 포함 dict 복사 생략)
+    key = f"{sa_info.get('client_email', '')}|{sa_info.get('private_key_id', '')}"
+    with _SA_CREDS_LOCK:
+        creds = _SA_CREDS.get(key)
+        if creds is None:
+            creds = creds_cls.from_service_account_info(sa_info, scopes=_SA_SCOPES)
+            _SA_CREDS.clear()  # 키 교체 시 이전 객체는 버림
+            _SA_CREDS[key] = creds
+    return _gspread().authorize(creds)
+
+# client_secret.json 존재 여부는 프로세스당 1회만 확인 (배포 환경엔 파일이 없으므로 이후 stat 생략)
+_HAS_LOCAL_OAUTH: Optional[bool] = None
+_OAUTH_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def _authorize_gspread_via_local_oauth():
     """로컬 개발용 fallback: client_secret.json / token.json 이용"""
-    base = Path(__file__).resolve().parent
-    cred_path = base / "client_secret.json"
-    token_path = base / "token.json"
-    if cred_path.exists():
-        return gspread.oauth(
-            credentials_filename=str(cred_path),
-            authorized_user_filename=str(token_path),
-        )
-    return None
+    global _HAS_LOCAL_OAUTH
+    cred_path = os.path.join(_OAUTH_DIR, "client_secret.json")
+    if _HAS_LOCAL_OAUTH is None:
+        _HAS_LOCAL_OAUTH = os.path.exists(cred_path)
+    if not _HAS_LOCAL_OAUTH:
+        return None
+    return _gspread().oauth(
+        credentials_filename=cred_path,
+        authorized_user_filename=os.path.join(_OAUTH_DIR, "token.json"),
+    )
+
+def _cache_resource(ttl: int, max_entries: Optional[int] = None):
+    """Streamlit 실행 중이면 st.cache_resource(리런 간 공유), 아니면 프로세스 내 lru_cache."""
+    if st is not None and hasattr(st, "cache_resource"):
+        return st.cache_resource(ttl=ttl, max_entries=max_entries, show_spinner=False)
+    return lru_cache(maxsize=max_entries)
+
+def _mount_pooled_adapter(gc: gspread.Client) -> gspread.Client:
+    """gspread 세션에 커넥션 풀 + keep-alive 어댑터 장착 (요청마다 TLS 재연결 방지)."""
+    session = getattr(gc, "session", None)  # gspread 5.x: Client.session (AuthorizedSession)
+    if session is None:
+        return gc
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        # 연결 실패만 재시도. HTTP 상태(429/5xx) 재시도는 with_retry가 담당 → 두 겹으로 쌓이지 않고
+        # 응답(.response.status_code)이 그대로 APIError로 올라옴
+        max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5, respect_retry_after_header=False),
+    )
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    install_fast_json(session)
+    return gc
+
+def _credentials_fingerprint() -> str:
+    """서비스계정 식별값(client_email + private_key_id)의 해시. 키 교체 시 캐시 키가 바뀐다."""
+    raw = "local-oauth"
+    if st is not None and hasattr(st, "secrets"):
+        try:
+            info = st.secrets["gcp_service_account"]
+            raw = f"{info.get('client_email', '')}|{info.get('private_key_id', '')}"
+        except Exception:
+            pass
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+# 인증된 gspread 클라이언트 (리런/시트 간 재사용 → 토큰 교환·TLS 핸드셰이크 반복 방지)
+@_cache_resource(ttl=3000)
+def _get_gspread_client(fingerprint: str) -> Optional[gspread.Client]:
+    gc = _authorize_gspread_via_service_account() or _authorize_gspread_via_local_oauth()
+    return _mount_pooled_adapter(gc) if gc is not None else None
+
+# 클라이언트 생성/조회 직렬화 (open_sheets_by_env_parallel의 워커 스레드와 스크립트 스레드가 동시에 호출해도
+# 인증·어댑터 장착은 1번만, 실패 시 캐시 비우기도 다른 스레드의 조회와 겹치지 않음)
+_CLIENT_LOCK = threading.Lock()
 
+def get_client() -> Optional[gspread.Client]:
+    """서비스계정 → 로컬 OAuth 순으로 인증한 클라이언트를 1회 만들고 재사용."""
+    with _CLIENT_LOCK:
+        gc = _get_gspread_client(_credentials_fingerprint())
+        if gc is None:
+            # 인증 실패(None)는 캐시에 남기지 않음 → secrets 설정 후 바로 재시도 가능
+            clear = getattr(_get_gspread_client, "clear", None) or _get_gspread_client.cache_clear
+            clear()
+    return gc
+
+# Spreadsheet 핸들 (open_by_key의 메타데이터 조회 왕복을 리런마다 반복하지 않음)
+@_cache_resource(ttl=1800, max_entries=8)
+def _open_by_key_cached(ss_id: str, fingerprint: str):
+    gc = get_client()
+    if gc is None:
+        raise RuntimeError("No valid Google credentials. Set Streamlit secrets or place client_secret.json for local OAuth.")
+    return gc.open_by_key(ss_id)
+
+@lru_cache(maxsize=32)
 def _get_ss_id_from_secrets_or_env(*keys: str) -> str:
     """
     Secrets → ENV 순서로 여러 키 이름(alias)을 검색하여 첫 값을 반환.
     예) _get_ss_id_from_secrets_or_env("REFERENCE_SPREADSHEET_ID", "REFERENCE_SHEET_KEY")
+    리런마다 반복 조회하지 않도록 keys 기준으로 캐시 (값 변경 시 clear_ss_id_cache()로 무효화).
     """
-    for k in keys:  # Secrets 우선
-        val = _get_from_secrets(k)
-        if val:
-            return val
-    for k in keys:  # 없으면 ENV
-        val = os.getenv(k, "").strip()
+    # 1회 순회: Secrets 적중 시 즉시 반환, ENV는 첫 적중값만 기억 (Secrets 우선 순위 유지)
+    get_secret, getenv = _get_from_secrets, os.getenv
+    env_val = ""
+    for k in keys:
+        val = get_secret(k)
         if val:
             return val
-    return ""
+        if not env_val:
+            env_val = getenv(k, "").strip()
+    return env_val
+
+def invalidate_sheet_cache():
+    """열린 Spreadsheet 핸들 + 탭/값 캐시 비우기 (설정 저장 후 새로 열도록)."""
+    clear = getattr(_open_by_key_cached, "clear", None) or _open_by_key_cached.cache_clear
+    clear()
+    with _WS_LOCK:
+        _WS_CACHE.clear()
+        _WS_LIST_CACHE.clear()
+    with _VALUES_LOCK:
+        _VALUES_CACHE.clear()
+
+def clear_ss_id_cache():
+    """시트 ID 조회 캐시 비우기 (.env/Secrets 값 변경 후 호출)."""
+    _get_ss_id_from_secrets_or_env.cache_clear()
 
 def open_sheet_by_env():
     """
@@ -246,10 +641,7 @@ def open_sheet_by_env():
     ss_id = _get_ss_id_from_secrets_or_env("GOOGLE_SHEETS_SPREADSHEET_ID", "GOOGLE_SHEET_KEY")
     if not ss_id:
         raise RuntimeError("GOOGLE_SHEETS_SPREADSHEET_ID (or GOOGLE_SHEET_KEY) not set in secrets/env.")
-    gc = _authorize_gspread_via_service_account() or _authorize_gspread_via_local_oauth()
-    if gc is None:
-        raise RuntimeError("No valid Google credentials. Set Streamlit secrets or place client_secret.json for local OAuth.")
-    return gc.open_by_key(ss_id)
+    return _open_by_key_cached(ss_id, _credentials_fingerprint())
 
 def open_ref_by_env():
     """
@@ -260,7 +652,26 @@ def open_ref_by_env():
     ref_id = _get_ss_id_from_secrets_or_env("REFERENCE_SPREADSHEET_ID", "REFERENCE_SHEET_KEY")
     if not ref_id:
         return None
-    gc = _authorize_gspread_via_service_account() or _authorize_gspread_via_local_oauth()
-    if gc is None:
-        raise RuntimeError("No valid Google credentials for reference sheet.")
-    return gc.open_by_key(ref_id)
\ No newline at end of file
+    return _open_by_key_cached(ref_id, _credentials_fingerprint())
+
+def open_sheets_by_env_parallel():
+    """
+    작업 시트 + 레퍼런스 시트를 함께 열어 (sh, ref) 반환 (ref 미설정 시 None).
+    인증은 먼저 1회 끝내고, 두 open_by_key 왕복은 동시에 진행.
+    """
+    load_env()
+    ss_id = _get_ss_id_from_secrets_or_env("GOOGLE_SHEETS_SPREADSHEET_ID", "GOOGLE_SHEET_KEY")
+    if not ss_id:
+        raise RuntimeError("GOOGLE_SHEETS_SPREADSHEET_ID (or GOOGLE_SHEET_KEY) not set in secrets/env.")
+    ref_id = _get_ss_id_from_secrets_or_env("REFERENCE_SPREADSHEET_ID", "REFERENCE_SHEET_KEY")
+    fingerprint = _credentials_fingerprint()
+    if not ref_id:
+        return _open_by_key_cached(ss_id, fingerprint), None
+
+    # 호출 스레드에서 클라이언트를 먼저 준비 (워커의 get_client()는 _CLIENT_LOCK 아래에서 캐시 적중만 함)
+    if get_client() is None:
+        raise RuntimeError("No valid Google credentials. Set Streamlit secrets or place client_secret.json for local OAuth.")
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        f_ref = ex.submit(_open_by_key_cached, ref_id, fingerprint)
+        sh = _open_by_key_cached(ss_id, fingerprint)
+        return sh, f_ref.result()
\ No newline at end of file
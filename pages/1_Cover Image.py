@@ -1,11 +1,12 @@
 import streamlit as st
-from pathlib import Path
+import os
 import sys
 
 # pages/ 아래에 있으므로 프로젝트 루트(shopee)를 sys.path에 추가 (견고성 ↑)
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.append(str(ROOT))
+# 리런마다 실행되므로 Path.resolve()(경로 단계별 stat) 대신 문자열 연산만 사용
+ROOT = os.path.abspath(__file__).rpartition(os.sep)[0].rpartition(os.sep)[0]
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)  # 2_Copy Template과 동일: 프로젝트 패키지를 첫 항목에서 바로 찾도록
 
 from image_compose.app import run as image_compose_run  # 폴더명이 image_compose 여야 함
 
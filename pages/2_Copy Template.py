@@ -1,20 +1,21 @@
 # pages/2_Copy Template.py
-from pathlib import Path
+import os
 import sys
 import streamlit as st
 
 st.set_page_config(page_title="Copy Template", layout="wide")
 
 # 프로젝트 루트(shopee)를 임포트 경로에 추가
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+# 리런마다 실행되므로 Path.resolve()(경로 단계별 stat) 대신 문자열 연산만 사용
+ROOT = os.path.abspath(__file__).rpartition(os.sep)[0].rpartition(os.sep)[0]
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
 
 # 내부 모듈 임포트
 from item_uploader.app import run as item_uploader_run
 from item_uploader.utils_common import (
-    extract_sheet_id, sheet_link,
-    get_env, save_env_value
+    extract_sheet_id, sheet_link, is_http_url,
+    get_env, save_env_values, invalidate_sheet_cache
 )
 
 # ==============================
@@ -23,15 +24,12 @@ from item_uploader.utils_common import (
 with st.sidebar:
     st.subheader("⚙️ 초기 설정")
 
-    # 현재 세션에 저장된 값 or env 값
-    cur_sid = st.session_state.get(
-        "GOOGLE_SHEETS_SPREADSHEET_ID",
-        get_env("GOOGLE_SHEETS_SPREADSHEET_ID")
-    )
-    cur_host = st.session_state.get(
-        "IMAGE_HOSTING_URL",
-        get_env("IMAGE_HOSTING_URL")
-    )
+    # 현재 세션에 저장된 값 or env 값 (세션에 없을 때만 1회 조회 → 리런마다 Secrets/ENV 재조회 안 함)
+    for _key in ("GOOGLE_SHEETS_SPREADSHEET_ID", "IMAGE_HOSTING_URL"):
+        if _key not in st.session_state:
+            st.session_state[_key] = get_env(_key)
+    cur_sid = st.session_state["GOOGLE_SHEETS_SPREADSHEET_ID"]
+    cur_host = st.session_state["IMAGE_HOSTING_URL"]
 
     with st.form("settings_form_copy_template"):
         sheet_url = st.text_input(
@@ -46,17 +44,22 @@ with st.sidebar:
         )
         submitted = st.form_submit_button("저장")
         if submitted:
+            # 검증/저장에 같은 정규화 값 사용 (공백 포함 주소가 검증만 통과하고 그대로 저장되지 않도록)
+            image_host = image_host.strip()
             sid = extract_sheet_id(sheet_url)
             if not sid:
                 st.error("올바른 Google Sheets URL을 입력해주세요.")
-            elif not image_host or not image_host.startswith(("http://", "https://")):
+            elif not is_http_url(image_host):
                 st.error("이미지 호스팅 주소를 확인해주세요.")
             else:
                 # 세션/환경 모두 업데이트
                 st.session_state["GOOGLE_SHEETS_SPREADSHEET_ID"] = sid
                 st.session_state["IMAGE_HOSTING_URL"] = image_host
-                save_env_value("GOOGLE_SHEETS_SPREADSHEET_ID", sid)
-                save_env_value("IMAGE_HOSTING_URL", image_host)
+                save_env_values({
+                    "GOOGLE_SHEETS_SPREADSHEET_ID": sid,
+                    "IMAGE_HOSTING_URL": image_host,
+                })
+                invalidate_sheet_cache()
                 st.success("설정이 저장되었습니다!")
                 st.rerun()
 
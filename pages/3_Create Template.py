@@ -1,9 +1,14 @@
 # pages/3_Create Template.py
 # -*- coding: utf-8 -*-
+import queue
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-from shopee_creator.controller import ShopeeCreator
-from shopee_creator.creation_steps import export_tem_xlsx, export_tem_csv
-from shopee_creator.utils_creator import extract_sheet_id, get_env
+from shopee_creator.utils_creator import extract_sheet_id, get_env, sheet_link
+# ShopeeCreator / export 헬퍼는 gspread·pandas를 끌어오므로 실제 실행 시점에 import
 
 # --------------------------------------------------------------------
 # 1) 페이지 설정
@@ -15,18 +20,19 @@ st.caption("상품등록 시트를 기반으로 신규 Mass Upload 템플릿을
 # --------------------------------------------------------------------
 # 2) Secrets 기반 레퍼런스 URL 체크(옵션)
 # --------------------------------------------------------------------
+# 리런마다 Secrets를 다시 읽지 않도록 짧은 TTL로 캐시
+@st.cache_data(ttl=60, show_spinner=False)
 def _get_ref_url_from_secrets() -> str | None:
+    # 컨트롤러와 같은 키 목록/우선순위로 판정 (폴백 키만 설정된 경우에도 안내가 뜨지 않도록)
+    from shopee_creator.controller import reference_url_from_secrets
+
     try:
-        s = st.secrets
-    except Exception:
+        sid = reference_url_from_secrets(st.secrets)
+    except Exception:  # secrets.toml 없음
         return None
-    sid = s.get("REFERENCE_SPREADSHEET_ID")
-    if sid:
-        sid = str(sid).strip()
-        if sid.startswith("http"):
-            return sid
-        return f"https://docs.google.com/spreadsheets/d/{sid}/edit"
-    return None
+    if not sid:
+        return None
+    return sid if sid.startswith("http") else sheet_link(sid)
 
 REF_URL = _get_ref_url_from_secrets()
 if not REF_URL:
@@ -35,14 +41,11 @@ if not REF_URL:
 # --------------------------------------------------------------------
 # 3) 세션 기본값
 # --------------------------------------------------------------------
-for k, v in {
-    "SHEET_URL": "",
-    "BASE_URL": get_env("IMAGE_HOSTING_URL", ""),
-    "SHOP_CODE": "",
-    "LAST_RUN_RESULTS": None,
-}.items():
-    if k not in st.session_state:
-        st.session_state[k] = v
+# 세션 최초 1회만 채움 (BASE_URL의 Secrets/ENV 조회도 리런마다 반복하지 않음)
+if "BASE_URL" not in st.session_state:
+    st.session_state.BASE_URL = get_env("IMAGE_HOSTING_URL", "")
+for k, v in (("SHEET_URL", ""), ("SHOP_CODE", ""), ("LAST_RUN_RESULTS", None)):
+    st.session_state.setdefault(k, v)
 
 # --------------------------------------------------------------------
 # 4) 초기 설정 폼
@@ -83,58 +86,188 @@ st.subheader("샵 코드 입력 및 실행")
 # --------------------------------------------------------------------
 # 5) 샵코드 입력 + 실행
 # --------------------------------------------------------------------
-if st.session_state.SHEET_URL:
-    col_shop, col_btn = st.columns([0.7, 0.3])
-    with col_shop:
-        shop_code_input = st.text_input(
-            "샵 코드 (입력 그대로 사용: 예 RO / ro / RO. 01 등)",
-            value=st.session_state.SHOP_CODE,
-            placeholder="예: RO, RO. 01",
+# C1~C6은 워커 스레드에서 실행하고, 스크립트 스레드는 큐만 폴링해 진행률을 그림.
+# 실행 중 리런이 일어나도 작업은 중단되지 않고(세션에 Future 보관) 다음 리런에서 다시 붙는다.
+# 풀은 프로세스 공용 → 여러 사용자의 실행이 한 줄로 밀리지 않도록 동시 세션 수만큼 워커를 둠
+# (CREATE_TEMPLATE_WORKERS, 기본 4). 풀이 가득 차면 대기 상태로 표시되고 자리가 나면 시작.
+@st.cache_resource(show_spinner=False)
+def _run_executor() -> ThreadPoolExecutor:
+    workers = max(1, int(get_env("CREATE_TEMPLATE_WORKERS", "4") or "4"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="create-template")
+
+# 다운로드용 컨트롤러는 읽기 전용이라 프로세스에서 1개만 만들어 공유
+# (실행용은 샵코드/Base URL을 인스턴스에 담으므로 실행마다 새로 생성)
+@st.cache_resource(show_spinner=False)
+def _export_ctrl():
+    from shopee_creator.controller import ShopeeCreator
+
+    return ShopeeCreator(st.secrets)
+
+def _build_download(sh, shop_code: str):
+    """TEM_OUTPUT → (버튼 라벨, bytes, 파일명, mime). XLSX 실패 시 CSV 폴백, 데이터 없으면 None. (st.* 호출 없음)"""
+    from shopee_creator.creation_steps import export_tem_xlsx, export_tem_csv, fetch_tem_values
+
+    # TEM_OUTPUT 값은 batchGet 1회로 받아 XLSX/CSV 폴백이 같이 사용
+    values = fetch_tem_values(sh)
+
+    xlsx_io = export_tem_xlsx(sh, values=values)
+    if xlsx_io:
+        return (
+            "📥 TEM_OUTPUT 내려받기 (XLSX)",
+            xlsx_io.getvalue(),
+            f"{shop_code}_TEM_OUTPUT.xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
-    with col_btn:
-        run_disabled = not shop_code_input
-        if st.button("🚀 실행", type="primary", use_container_width=True, disabled=run_disabled):
-            st.session_state.SHOP_CODE = shop_code_input  # 보정 없음
-            st.session_state.RUN_TRIGGERED = True
-            st.session_state.LAST_RUN_RESULTS = None
-            st.rerun()
+    csv_bytes = export_tem_csv(sh, values=values)
+    if csv_bytes:
+        return ("📥 TEM_OUTPUT 내려받기 (CSV - 폴백)", csv_bytes, f"{shop_code}_TEM_OUTPUT.csv", "text/csv")
+    return None
+
+def _run_creator(secrets, sheet_url: str, base_url: str, shop_code: str, events: queue.Queue):
+    from shopee_creator.controller import ShopeeCreator
+
+    events.put((0, "C1~C6 실행 중..."))  # 워커가 실제로 시작한 시점 (그 전까지는 대기 중으로 표시)
+    ctrl = ShopeeCreator(secrets)
+    # ✅ run() 전에 반드시 값 주입 (입력 그대로 사용)
+    ctrl.set_image_base(base_url=base_url, shop_code=shop_code)
+    # 한 번에 실행 (내부에서 실패 시 중단) — 진행률은 큐로만 전달 (워커에서 st.* 호출 안 함)
+    out = {"results": ctrl.run(
+        input_sheet_url=sheet_url,
+        progress_callback=lambda p, m: events.put((p, m)),
+    )}
+    # 같은 워커에서 이어서 다운로드 파일까지 생성 (실행 때 연 시트 핸들 재사용, 결과 화면은 버튼만 그림)
+    events.put((100, "다운로드 파일 생성 ..."))
+    try:
+        out["download"] = _build_download(ctrl.open_sheet(sheet_url), shop_code)
+    except Exception as e:
+        print(f"[WARN] 다운로드 파일 사전 생성 실패 (결과 화면에서 재시도): {e}")
+    return out
+
+def _job_active() -> bool:
+    """이 세션에 아직 끝나지 않은 실행이 있는지."""
+    job = st.session_state.get("RUN_JOB")
+    return bool(job) and not job["future"].done()
+
+def _start_run(shop_code: str) -> bool:
+    """
+    워커에 C1~C6 작업을 제출하고 세션에 Future/진행 상태를 보관 (제출 즉시 반환).
+    이전 실행이 진행 중이면 제출하지 않고 False (같은 TEM_OUTPUT에 파이프라인 2개가 동시에 쓰지 않도록).
+    """
+    if _job_active():
+        return False
+    events: queue.Queue = queue.Queue()
+    st.session_state.RUN_JOB = {
+        "future": _run_executor().submit(
+            _run_creator, st.secrets,
+            st.session_state.SHEET_URL, st.session_state.BASE_URL, shop_code, events,
+        ),
+        "events": events,
+        "sheet_url": st.session_state.SHEET_URL,
+        "shop_code": shop_code,
+        "last": (0, "⏳ 실행 대기 중..."),
+        "history": deque(maxlen=200),  # 단계 메시지 스크롤백 (리런 후 재부착 시에도 유지)
+    }
+    return True
+
+# 샵코드 입력은 fragment 안에서만 리런 → 아래 결과/다운로드(시트 export) 구간을 다시 실행하지 않음
+# (st.fragment는 1.37+, 그 이전은 experimental_fragment)
+# 입력+실행 버튼은 form으로 묶어 실행 버튼을 누를 때만 리런 (입력 중에는 리런 없음)
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+@_fragment
+def _shop_code_section():
+    with st.form("run_form", clear_on_submit=False, border=False):
+        col_shop, col_btn = st.columns([0.7, 0.3])
+        with col_shop:
+            shop_code_input = st.text_input(
+                "샵 코드 (입력 그대로 사용: 예 RO / ro / RO. 01 등)",
+                value=st.session_state.SHOP_CODE,
+                placeholder="예: RO, RO. 01",
+            )
+        with col_btn:
+            # 실행 중에는 비활성화 (완료 시 6)에서 전체 리런 → 다시 활성화)
+            run_clicked = st.form_submit_button(
+                "🚀 실행", type="primary", use_container_width=True, disabled=_job_active(),
+            )
+    if run_clicked:
+        if not shop_code_input:
+            st.error("샵 코드를 입력해 주세요.")
+            return
+        # 클릭한 실행에서 바로 제출 (트리거 플래그 → 리런 → 제출 단계 없음)
+        if not _start_run(shop_code_input):
+            st.warning("이전 실행이 아직 진행 중입니다. 완료 후 다시 실행해 주세요.")
+            return
+        st.session_state.SHOP_CODE = shop_code_input  # 보정 없음
+        st.session_state.LAST_RUN_RESULTS = None
+        st.rerun()  # 진행률/결과 영역은 fragment 밖이라 전체 리런으로 그림
+
+if st.session_state.SHEET_URL:
+    _shop_code_section()
 
 # --------------------------------------------------------------------
 # 6) 실행 로직
 # --------------------------------------------------------------------
-if st.session_state.get("RUN_TRIGGERED") and st.session_state.SHOP_CODE:
-    st.session_state.RUN_TRIGGERED = False
-    sheet_url = st.session_state.SHEET_URL
-    base_url  = st.session_state.BASE_URL
-    shop_code = st.session_state.SHOP_CODE
-
+# 실행 중인 작업이 있으면 큐를 폴링해 진행률을 그림 (제출은 5)의 실행 버튼에서)
+# 완료되면 결과를 RUN_NOTICE에 담아 전체 리런 → 실행 버튼이 활성 상태로 다시 그려지고, 로그/결과는 1회 표시
+job = st.session_state.get("RUN_JOB")
+if job:
     st.subheader("실행 로그")
-    progress = st.progress(0, text="C1~C6 실행 중...")
+    progress = st.progress(job["last"][0] / 100, text=job["last"][1])
+    log_area = st.empty()
+    history = job["history"]
+    if history:
+        log_area.code("\n".join(history), language=None)
+    fut, events = job["future"], job["events"]
+    while True:
+        done = fut.done()
+        last = None
+        try:
+            while True:  # 쌓인 이벤트는 기록만 하고, 화면은 마지막 것 기준으로 1회만 갱신
+                last = events.get_nowait()
+                history.append(last[1])
+        except queue.Empty:
+            pass
+        if last is not None:
+            job["last"] = last
+            progress.progress(last[0] / 100, text=last[1])
+            log_area.code("\n".join(history), language=None)
+        if done:
+            break
+        time.sleep(0.1)
 
+    st.session_state.RUN_JOB = None
+    notice = {"history": list(history), "exc": None}
     try:
-        ctrl = ShopeeCreator(st.secrets)
-        # ✅ run() 전에 반드시 값 주입 (입력 그대로 사용)
-        ctrl.set_image_base(base_url=base_url, shop_code=shop_code)
-
-        # 한 번에 실행 (내부에서 실패 시 중단)
-        logs = ctrl.run(input_sheet_url=sheet_url)
-        progress.progress(1.0, text="✅ 모든 단계 완료")
-
+        out = fut.result()
         st.session_state.LAST_RUN_RESULTS = {
-            "sheet_url": sheet_url,
-            "shop_code": shop_code,
-            "results": logs,
+            "sheet_url": job["sheet_url"],
+            "shop_code": job["shop_code"],
+            **out,  # results (+ 사전 생성된 download)
         }
-        st.success("템플릿 생성 완료 ✅")
-
     except Exception as e:
-        progress.empty()
-        st.exception(e)
+        traceback.clear_frames(e.__traceback__)  # 세션에 보관하는 동안 워커 프레임(시트 값 등)을 붙잡지 않도록
+        notice["exc"] = e
+    st.session_state.RUN_NOTICE = notice
+    st.rerun()
+
+notice = st.session_state.pop("RUN_NOTICE", None)
+if notice:
+    st.subheader("실행 로그")
+    if notice["exc"] is None:
+        st.progress(1.0, text="✅ 모든 단계 완료")
+    if notice["history"]:
+        st.code("\n".join(notice["history"]), language=None)
+    if notice["exc"] is None:
+        st.success("템플릿 생성 완료 ✅")
+    else:
+        st.exception(notice["exc"])
         st.error("템플릿 생성 중 오류가 발생했습니다. 로그를 확인해 주세요.")
 
 # --------------------------------------------------------------------
 # 7) 결과 표시 + 다운로드
 # --------------------------------------------------------------------
+_STATUS_ICON = ("❌", "✅")  # log.ok(bool)로 인덱싱
+
 if st.session_state.LAST_RUN_RESULTS:
     data = st.session_state.LAST_RUN_RESULTS
     results = data["results"]
@@ -142,40 +275,32 @@ if st.session_state.LAST_RUN_RESULTS:
     shop_code = data["shop_code"]
 
     with st.expander("세부 실행 로그 (C1~C6)", expanded=False):
-        for log in results:
-            status = "✅" if log.ok else "❌"
-            st.markdown(f"**{status} {log.name}**")
-            if log.error:
-                st.error(f"오류: {log.error}")
+        if not any(log.error for log in results):
+            # 오류가 없으면(일반적인 경우) 단계별 줄을 하나의 markdown으로 전송
+            st.markdown("  \n".join(f"**{_STATUS_ICON[log.ok]} {log.name}**" for log in results))
+        else:
+            for log in results:
+                st.markdown(f"**{_STATUS_ICON[log.ok]} {log.name}**")
+                if log.exc is not None:
+                    st.exception(log.exc)
+                elif log.error:
+                    st.error(f"오류: {log.error}")
 
     st.markdown("---")
     st.subheader("최종 파일 다운로드")
 
-    try:
-        # Export는 별도 gspread client로 열어도 무방
-        ctrl = ShopeeCreator(st.secrets)
-        sh = ctrl.gs.open_by_url(sheet_url)
-
-        xlsx_io = export_tem_xlsx(sh)
-        if xlsx_io:
-            st.download_button(
-                "📥 TEM_OUTPUT 내려받기 (XLSX)",
-                data=xlsx_io.getvalue(),
-                file_name=f"{shop_code}_TEM_OUTPUT.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-            )
-        else:
-            csv_bytes = export_tem_csv(sh)
-            if csv_bytes:
-                st.download_button(
-                    "📥 TEM_OUTPUT 내려받기 (CSV - 폴백)",
-                    data=csv_bytes,
-                    file_name=f"{shop_code}_TEM_OUTPUT.csv",
-                    mime="text/csv",
-                    use_container_width=True,
-                )
-            else:
-                st.info("다운로드 데이터가 없습니다. TEM_OUTPUT 시트를 확인해 주세요.")
-    except Exception as ex:
-        st.warning(f"다운로드 생성 중 오류: {ex}")
+    # 내보낸 파일은 실행 워커가 미리 만들어 LAST_RUN_RESULTS에 보관 → 리런은 버튼만 다시 그림
+    # (새 실행/설정 저장 시 LAST_RUN_RESULTS가 초기화되므로 자연히 무효화). 사전 생성 실패 시에만 여기서 생성
+    if "download" not in data:
+        try:
+            with st.spinner("다운로드 파일 생성 중..."):
+                data["download"] = _build_download(_export_ctrl().open_sheet(sheet_url), shop_code)
+        except Exception as ex:
+            st.warning(f"다운로드 생성 중 오류: {ex}")  # 실패는 캐시하지 않음 (다음 리런에서 재시도)
+
+    download = data.get("download", False)
+    if download:
+        label, payload, file_name, mime = download
+        st.download_button(label, data=payload, file_name=file_name, mime=mime, use_container_width=True)
+    elif download is None:
+        st.info("다운로드 데이터가 없습니다. TEM_OUTPUT 시트를 확인해 주세요.")
@@ -1,4 +1,5 @@
 # scripts/normalize_icons.py
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from pathlib import Path
 
@@ -8,19 +9,28 @@ CANVAS = 144       # @3x
 PADDING = 8        # 글로우 여유 (1x 4~8px 기준 -> @3x에선 8~24px)
 
 def normalize_one(src_path: Path, out_name: str):
-    img = Image.open(src_path).convert("RGBA")
-    canvas = Image.new("RGBA", (CANVAS, CANVAS), (0,0,0,0))
+    out_path = DST_DIR / out_name
+    # 결과가 원본보다 새로우면 디코드/리사이즈/인코딩 생략 (반복 실행은 stat만)
+    if out_path.exists() and src_path.stat().st_mtime <= out_path.stat().st_mtime:
+        print("cached:", out_path)
+        return
 
     target = CANVAS - 2*PADDING
+    img = Image.open(src_path)
+    img.draft("RGB", (target, target))  # JPEG 원본이면 디코드 단계에서 축소 (PNG는 무시됨)
+    img = img.convert("RGBA")
+    canvas = Image.new("RGBA", (CANVAS, CANVAS), (0,0,0,0))
+
     ratio = min(target / img.width, target / img.height)
     new_size = (max(1, int(img.width*ratio)), max(1, int(img.height*ratio)))
-    scaled = img.resize(new_size, Image.LANCZOS)
+    # 큰 원본은 정수배 박스 축소로 먼저 줄인 뒤 남은 배율만 LANCZOS (확대/소폭 축소는 기존과 동일)
+    scaled = img.resize(new_size, Image.LANCZOS, reducing_gap=3.0)
 
     x = (CANVAS - scaled.width) // 2
     y = (CANVAS - scaled.height) // 2
     canvas.paste(scaled, (x, y), scaled)
-    out_path = DST_DIR / out_name
-    canvas.save(out_path, optimize=True)
+    # 144px 아이콘은 압축 레벨을 올려도 용량 차이가 미미 → optimize(레벨 9 + 필터 탐색) 대신 빠른 레벨로 저장
+    canvas.save(out_path, format="PNG", compress_level=3)
     print("saved:", out_path)
 
 def main():
@@ -29,12 +39,16 @@ def main():
         "copy.png":   "copy@3x.png",
         "create.png": "create@3x.png",
     }
+    jobs = []
     for k, v in mapping.items():
         src = SRC_DIR / k
         if src.exists():
-            normalize_one(src, v)
+            jobs.append((src, v))
         else:
             print("skip (not found):", src)
+    # 아이콘별 디코드/리사이즈/PNG 인코딩은 Pillow C 코드에서 GIL을 풀고 돌아감 → 스레드로 병렬 처리
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as ex:
+        list(ex.map(lambda job: normalize_one(*job), jobs))
 
 if __name__ == "__main__":
     main()
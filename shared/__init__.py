@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+shared (item_uploader / shopee_creator 공용 헬퍼)
+
+- text: 순수 문자열 유틸 (시트 ID/URL 파싱, 헤더 정규화 등)
+- fast_json: requests 세션용 orjson 디코드 훅
+어느 앱 패키지에도 의존하지 않는다.
+"""
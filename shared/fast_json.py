@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+shared/fast_json.py (requests/AuthorizedSession 응답 JSON 디코드 가속)
+
+orjson이 설치되어 있으면 응답 훅으로 r.json()을 orjson.loads로 교체한다. 미설치 시 아무것도 하지 않음.
+"""
+
+from __future__ import annotations
+
+# orjson (선택): 있으면 API 응답 JSON 디코드를 C 구현으로 대체
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore
+
+def _orjson_response_hook(r, *args, **kwargs):
+    """JSON 응답의 r.json()을 orjson.loads로 교체 (대용량 values 응답 파싱 가속)."""
+    if "json" in r.headers.get("Content-Type", ""):
+        r.json = lambda **kw: orjson.loads(r.content)
+    return r
+
+def install_fast_json(session) -> None:
+    """requests 세션에 orjson 디코드 훅 장착 (orjson 미설치 시 아무것도 안 함)."""
+    if orjson is None:
+        return
+    hooks = session.hooks.setdefault("response", [])
+    if _orjson_response_hook not in hooks:
+        hooks.append(_orjson_response_hook)
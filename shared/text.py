@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+shared/text.py (외부 의존성 없는 순수 문자열 유틸, item_uploader / shopee_creator 공용)
+
+- 문자열/헤더 정규화
+- 색상 HEX 변환
+- 시트 ID/URL, 카테고리 문자열 파싱
+item_uploader.utils_common에서 그대로 re-export 하므로 기존 import 경로는 유지된다.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+# 문자열/헤더 정규화
+# NBSP → 공백, zero-width 문자 제거 (translate 1회 패스)
+_NORM_TABLE = str.maketrans({"\u00a0": " ", "\u200b": None, "\u200c": None, "\u200d": None})
+
+def norm(s: str) -> str:
+    return str(s or "").strip().lower().translate(_NORM_TABLE)
+
+_RE_HEADER_KEY = re.compile(r"[^a-z0-9\-]+")
+
+def header_key(s: str) -> str:
+    """헤더 비교용: 영숫자+하이픈만 남김"""
+    return _RE_HEADER_KEY.sub("", norm(s))
+
+@lru_cache(maxsize=512)
+def hex_to_rgb01(hex_str: str) -> tuple[float, float, float]:
+    """#RRGGBB → (red, green, blue) (0~1 float). 색상 수가 적어 결과를 캐시."""
+    hex_str = hex_str.lstrip("#")
+    if len(hex_str) != 6:
+        return (1.0, 1.0, 0.7)
+    r, g, b = (int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+    return (r / 255.0, g / 255.0, b / 255.0)
+
+_RE_SHEET_ID = re.compile(r"[A-Za-z0-9\-_]{25,}")
+_RE_SHEET_URL = re.compile(r"/spreadsheets/d/([A-Za-z0-9\-_]+)")
+
+@lru_cache(maxsize=256)
+def extract_sheet_id(s: str) -> str | None:
+    """URL/ID 문자열 → 시트 ID (리런마다 같은 입력이 반복되므로 결과 캐시)"""
+    s = (s or "").strip()
+    if not s:
+        return None
+    # 순수 ID에는 '/'가 없으므로 모양으로 먼저 분기 (정규식 1회만 실행)
+    if "/" not in s:
+        return s if _RE_SHEET_ID.fullmatch(s) else None
+    if "/spreadsheets/d/" not in s:
+        return None  # 시트 URL이 아님 → 정규식 생략
+    m = _RE_SHEET_URL.search(s)
+    return m.group(1) if m else None
+
+@lru_cache(maxsize=64)
+def sheet_link(sid: str) -> str:
+    return f"https://docs.google.com/spreadsheets/d/{sid}/edit"
+
+def is_http_url(u: str) -> bool:
+    """http(s):// 로 시작하고 호스트가 비어있지 않은지만 확인 (urlparse 없이 접두사 비교)"""
+    u = (u or "").strip()
+    if u[:8] == "https://":
+        host = u[8:]
+    elif u[:7] == "http://":
+        host = u[7:]
+    else:
+        return False
+    return bool(host) and host[0] != "/" and " " not in host
+
+_RE_CATEGORY_ID = re.compile(r"^\s*\d+\s*-\s*(.+)$")
+
+def strip_category_id(cat: str) -> str:
+    """'101814 - Home & Living/...' -> 'Home & Living/...'"""
+    s = str(cat or "")
+    m = _RE_CATEGORY_ID.match(s)
+    return m.group(1) if m else s
+
+_RE_CAT_SPLIT = re.compile(r"[/>|\\]")
+
+def top_of_category(cat: str) -> Optional[str]:
+    """TopLevel 추출 (첫 구분자 /, >, |, \\ 앞부분)"""
+    if not cat:
+        return None
+    tail = _RE_CAT_SPLIT.split(strip_category_id(cat), maxsplit=1)[0].strip()
+    return tail.lower() or None
@@ -1,17 +1,88 @@
 # shopee_creator/controller.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional
-import traceback
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
 import json
-import gspread
-from google.oauth2.service_account import Credentials
+import threading
+import traceback
+
+from cachetools import TTLCache
 
-from .utils_creator import with_retry, extract_sheet_id
-from . import creation_steps as steps  # C1~C6 & export helpers
+from .utils_creator import with_retry, extract_sheet_id, _load_gspread
 
 
 # ---- module-level helper -----------------------------------------------------
+_SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.readonly",
+)
+
+# 서비스계정별 AuthorizedSession 1개를 프로세스 전체에서 공유
+# (ShopeeCreator 인스턴스가 새로 생겨도 커넥션 풀/토큰 재사용 → 호출마다 TLS 핸드셰이크 방지)
+# google-auth / requests 어댑터는 첫 세션 생성 시점에 import
+_SESSIONS: dict[str, "AuthorizedSession"] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _pooled_session(info: dict) -> "AuthorizedSession":
+    key = f"{info.get('client_email', '')}|{info.get('private_key_id', '')}"
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            from google.auth.transport.requests import AuthorizedSession
+            from google.oauth2.service_account import Credentials
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            from shared.fast_json import install_fast_json
+
+            creds = Credentials.from_service_account_info(info, scopes=list(_SCOPES))
+            session = AuthorizedSession(creds)
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                # 연결 실패만 재시도. 429/5xx는 응답 그대로 APIError로 올려 utils_creator.with_retry가
+                # Retry-After(상한 60초)를 반영해 재시도 (어댑터와 두 겹으로 쌓이지 않도록)
+                max_retries=Retry(
+                    total=3, connect=3, read=0, status=0, backoff_factor=0.3, respect_retry_after_header=False,
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            install_fast_json(session)
+            _SESSIONS[key] = session
+        return session
+
+
+# 시트 핸들 (서비스계정, URL/ID) → Spreadsheet. 입력 시트·레퍼런스 시트 공용.
+# 실행/다운로드마다 open_by_url/open_by_key(메타데이터 조회 1왕복)를 반복하지 않음. 탭/값은 매번 실시간 조회.
+_SHEETS: TTLCache = TTLCache(maxsize=32, ttl=1800)
+_SHEETS_LOCK = threading.Lock()
+
+
+def clear_sheet_handles() -> None:
+    """캐시된 시트 핸들 폐기 (시트 교체/권한 변경 후 즉시 반영할 때)."""
+    with _SHEETS_LOCK:
+        _SHEETS.clear()
+
+
+# 레퍼런스 시트 ID/URL을 찾는 secrets 키 (앞쪽 우선, URL 그대로 넣어도 허용)
+_REF_KEYS = ("REFERENCE_SPREADSHEET_ID", "REF_SHEET_URL", "REF_URL", "ref_url")
+
+
+def reference_url_from_secrets(secrets) -> Optional[str]:
+    """secrets에서 레퍼런스 시트 ID/URL을 찾아 반환 (첫 유효값에서 중단, 없으면 None)."""
+    s = secrets or {}
+    for k in _REF_KEYS:
+        v = s.get(k)
+        if v and str(v).strip():
+            return str(v).strip()
+    # st.secrets의 [refs] 섹션은 dict가 아닌 Mapping(AttrDict) → get 유무로 판정
+    refs = s.get("refs")
+    v = refs.get("sheet_url") if hasattr(refs, "get") else None
+    v = str(v).strip() if v else ""
+    return v or None
+
+
 def _raise_missing(what: str):
     # Streamlit에서 보기 좋은 메시지로 즉시 중단
     raise RuntimeError(f"[C5] {what}이(가) 설정되지 않았습니다. 페이지에서 set_image_base()를 먼저 호출하세요.")
@@ -23,6 +94,7 @@ class StepLog:
     ok: bool
     count: int | None = None
     error: str | None = None
+    exc: BaseException | None = field(default=None, repr=False)  # 트레이스백은 화면에서 st.exception으로 렌더
 
 
 class ShopeeCreator:
@@ -57,11 +129,20 @@ class ShopeeCreator:
         self.shop_code = shop_code
 
     # ---- 실행 파이프라인 ------------------------------------------------------
-    def run(self, *, input_sheet_url: str) -> List[StepLog]:
+    def run(
+        self,
+        *,
+        input_sheet_url: str,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ) -> List[StepLog]:
+        from . import creation_steps as steps  # C1~C6 (gspread/pandas 의존 → 실행 시점 import)
+
         logs: List[StepLog] = []
+        # 콜백 유무는 진입 시 한 번만 판정 (단계마다 분기하지 않음)
+        cb = progress_callback or (lambda p, m: None)
 
         # 입력 시트 오픈
-        sh = with_retry(lambda: self.gs.open_by_url(input_sheet_url))
+        sh = self.open_sheet(input_sheet_url)
         self._current_sh = sh
 
         # 레퍼런스 시트 오픈
@@ -87,49 +168,50 @@ class ShopeeCreator:
             ("C6 Stock/Weight/Brand",lambda: steps.run_step_C6_stock_weight_brand(sh)),
         ]
 
-        for name, fn in pipeline:
+        total = len(pipeline)
+        for i, (name, fn) in enumerate(pipeline):
+            cb(int(i * 100 / total), f"{name} ...")
             try:
                 fn()
                 logs.append(StepLog(name=name, ok=True))
             except Exception as e:
-                logs.append(StepLog(name=name, ok=False, error=f"{e}\n{traceback.format_exc()}"))
+                # 세션에 보관되는 예외가 프레임 지역변수(시트/응답 등)를 붙잡지 않도록 정리
+                traceback.clear_frames(e.__traceback__)
+                logs.append(StepLog(name=name, ok=False, error=str(e), exc=e))
                 break  # 실패 시 파이프라인 중단 (원하면 계속 진행으로 변경 가능)
+        else:
+            cb(100, "Done")
 
         return logs
 
     # ---- internals ------------------------------------------------------------
+    def open_sheet(self, url: str):
+        """URL 또는 ID로 스프레드시트 오픈 (핸들 캐시 재사용)."""
+        key = (self._auth_key, url)
+        with _SHEETS_LOCK:
+            sh = _SHEETS.get(key)
+        if sh is not None:
+            return sh
+
+        # URL이면 open_by_url, ID만이면 open_by_key
+        if url.startswith("http"):
+            sh = with_retry(lambda: self.gs.open_by_url(url))
+        else:
+            sheet_id = extract_sheet_id(url)
+            sh = with_retry(lambda: self.gs.open_by_key(sheet_id))
+        with _SHEETS_LOCK:
+            _SHEETS[key] = sh
+        return sh
+
     def _open_ref_sheet(self):
         url = self.ref_url
         if not url:
             # secrets에 ID/URL 어느 형태든 하나는 있어야 함
             raise RuntimeError("REFERENCE_SPREADSHEET_ID (or REF_URL) is not set in secrets.")
-
-        # URL 또는 ID 처리
-        sheet_id = extract_sheet_id(url)
-        # URL이면 open_by_url, ID만이면 open_by_key
-        if url.startswith("http"):
-            return with_retry(lambda: self.gs.open_by_url(url))
-        return with_retry(lambda: self.gs.open_by_key(sheet_id))
+        return self.open_sheet(url)
 
     def _get_reference_url(self) -> Optional[str]:
-        s = self.secrets or {}
-        sid = s.get("REFERENCE_SPREADSHEET_ID")
-        if sid:
-            sid = str(sid).strip()
-            if sid:
-                # URL 그대로 넣어도 허용
-                return sid
-
-        # 폴백 키들
-        for v in (
-            s.get("REF_SHEET_URL"),
-            s.get("REF_URL"),
-            s.get("ref_url"),
-            (s.get("refs") or {}).get("sheet_url") if isinstance(s.get("refs"), dict) else None,
-        ):
-            if v:
-                return str(v).strip()
-        return None
+        return reference_url_from_secrets(self.secrets)
 
     def _build_gspread_client(self):
         s = self.secrets or {}
@@ -149,12 +231,9 @@ class ShopeeCreator:
         client_email = info.get("client_email", "N/A")
         print(f"[AUTH_CHECK] Authenticating as service account: {client_email}")
 
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive.readonly",
-        ]
-        creds = Credentials.from_service_account_info(info, scopes=scopes)
-        return gspread.authorize(creds)
+        self._auth_key = f"{info.get('client_email', '')}|{info.get('private_key_id', '')}"
+        session = _pooled_session(info)
+        return _load_gspread().Client(auth=session.credentials, session=session)
 
     # (과거 미구현 메서드 - 현재 파이프라인에서 직접 호출하므로 사용 안 함)
     def _run_c5_images(self):
@@ -10,8 +10,8 @@ from io import BytesIO
 
 import gspread
 from gspread.cell import Cell
-from gspread.utils import rowcol_to_a1
-from gspread.exceptions import WorksheetNotFound
+from gspread.utils import rowcol_to_a1, absolute_range_name, fill_gaps
+from gspread.exceptions import APIError, WorksheetNotFound
 import pandas as pd
 
 from .utils_creator import (
@@ -1015,115 +1015,186 @@ def run_step_C7_mandatory_defaults(sh, ref):
 # -------------------------------------------------------------------
 # Export helpers (xlsx / csv)
 # -------------------------------------------------------------------
-def export_tem_xlsx(sh: gspread.Spreadsheet) -> Optional[BytesIO]:
+def fetch_tem_values(sh: gspread.Spreadsheet, title: Optional[str] = None) -> Optional[List[List[str]]]:
+    """
+    TEM_OUTPUT 전체 값을 values.batchGet 1회로 조회 (worksheet 메타데이터 조회 왕복 없음).
+    - get_all_values()와 같은 직사각형 모양으로 패딩. 탭이 없으면 None.
+    """
+    title = title or get_tem_sheet_name()
+    try:
+        resp = with_retry(lambda: sh.values_batch_get([absolute_range_name(title)])) or {}
+    except APIError as e:
+        if "Unable to parse range" in str(e):
+            return None
+        raise
+    ranges = resp.get("valueRanges") or [{}]
+    return fill_gaps(ranges[0].get("values", []))
+
+def _tem_sections(all_data: List[List[str]]):
+    """
+    TEM_OUTPUT 값을 Category 헤더 행 기준 구간으로 나눠 (시트명, 헤더, 데이터 행들) 목록으로 반환.
+    - A열 PID 제거, Category 형식 정규화 포함. 헤더 뒤 데이터가 없는 구간은 제외.
+    """
+    header_indices = [i for i, row in enumerate(all_data) if len(row) > 1 and str(row[1]).lower() == "category"]
+    sections = []
+    for i, header_index in enumerate(header_indices):
+        start_row = header_index + 1
+        end_row = header_indices[i + 1] if i + 1 < len(header_indices) else len(all_data)
+        if start_row >= end_row:
+            continue
+
+        header_row = [str(v) for v in all_data[header_index][1:]]
+        rows = [[str(v) for v in r[1:]] for r in all_data[start_row:end_row]]
+        width = max(len(r) for r in rows)
+        for r in rows:
+            if len(r) < width:
+                r.extend([""] * (width - len(r)))
+
+        # Category 표준화
+        if width > 0 and header_row and header_key(header_row[0]) == "category":
+            for r in rows:
+                r[0] = re.sub(r"\s*-\s*", "-", r[0])
+
+        columns = header_row
+        if len(columns) != width:
+            if len(columns) < width:
+                columns += [f"col_{k}" for k in range(len(columns), width)]
+            else:
+                columns = columns[:width]
+
+        cat_idx = next((k for k, c in enumerate(columns) if c.lower() == "category"), None)
+        first_cat = rows[0][cat_idx] if cat_idx is not None else "UNKNOWN"
+        top_level_name = top_of_category(first_cat) or "UNKNOWN"
+        sheet_name = re.sub(r"[\s/\\*?:\\[\\]]", "_", str(top_level_name).title())[:31]
+        sections.append((sheet_name, columns, rows))
+    return sections
+
+def export_tem_xlsx(sh: gspread.Spreadsheet, values: Optional[List[List[str]]] = None) -> Optional[BytesIO]:
     """
     TEM_OUTPUT 시트를 TopLevel Category 단위로 분할하여 Excel(xlsx) 파일 반환.
     - A열 PID 제거, Category 형식 정규화 포함.
+    - xlsxwriter가 있으면 DataFrame 없이 행 순서대로 바로 기록 (constant_memory: 워크시트 XML을
+      메모리에 쌓지 않고 임시 파일로 흘려보냄)
+    - values(fetch_tem_values 결과)를 넘기면 시트 재조회 생략
     """
     if not sh:
         return None
-    tem_name = get_tem_sheet_name()
-    try:
-        tem_ws = safe_worksheet(sh, tem_name)
-    except WorksheetNotFound:
-        return None
-
-    all_data = with_retry(lambda: tem_ws.get_all_values())
+    all_data = values if values is not None else fetch_tem_values(sh)
     if not all_data:
         return None
 
-    df = pd.DataFrame(all_data)
-    for c in df.columns:
-        df[c] = df[c].astype(str)
-    
-    header_mask = df.iloc[:, 1].str.lower().eq("category")
-    header_indices = df.index[header_mask].tolist()
-    if not header_indices:
+    sections = _tem_sections(all_data)
+    del all_data
+    if not sections:
         print("[!] TEM_OUTPUT 헤더 행(Category)을 찾을 수 없습니다.")
         return None
 
     output = BytesIO()
 
     try:
-        import xlsxwriter  # noqa: F401
-        engine = "xlsxwriter"
+        import xlsxwriter
     except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is not None:
+        names = [name for name, _, _ in sections]
+        # constant_memory는 이미 지나간 행을 다시 쓸 수 없음 → 같은 시트명이 반복되면(뒤 구간이 덮어씀) 일반 모드
+        wb = xlsxwriter.Workbook(output, {"constant_memory": len(set(names)) == len(names)})
+        # pandas.to_excel 헤더 스타일과 동일 (굵게 + 얇은 테두리 + 가운데/위 정렬)
+        header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        sheets: Dict[str, object] = {}
+        for sheet_name, columns, rows in sections:
+            ws = sheets.get(sheet_name)
+            if ws is None:
+                ws = sheets[sheet_name] = wb.add_worksheet(sheet_name)
+            for c, v in enumerate(columns):
+                ws.write(0, c, v, header_fmt)
+            for r, row in enumerate(rows, start=1):
+                for c, v in enumerate(row):
+                    if v != "":
+                        ws.write(r, c, v)
+        wb.close()
+    else:
         try:
-            import openpyxl  # noqa: F401
-            engine = "openpyxl"
+            import openpyxl
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Alignment, Border, Font, Side
         except ImportError:
             print("[!] xlsx 생성용 라이브러리(xlsxwriter/openpyxl)가 없습니다.")
             return None
-
-    with pd.ExcelWriter(output, engine=engine) as writer:
-        for i, header_index in enumerate(header_indices):
-            start_row = header_index + 1
-            end_row = header_indices[i + 1] if i + 1 < len(header_indices) else len(df)
-            if start_row >= end_row:
-                continue
-
-            header_row = df.iloc[header_index, 1:]
-            chunk_df = df.iloc[start_row:end_row, 1:].copy()
-
-            # Category 표준화
-            if not chunk_df.empty and chunk_df.shape[1] > 0 and header_key(header_row.iloc[0]) == "category":
-                chunk_df.iloc[:, 0] = chunk_df.iloc[:, 0].astype(str).str.replace(r"\s*-\s*", "-", regex=True)
-
-            columns = header_row.astype(str).tolist()
-            if len(columns) != chunk_df.shape[1]:
-                if len(columns) < chunk_df.shape[1]:
-                    columns += [f"col_{k}" for k in range(len(columns), chunk_df.shape[1])]
-                else:
-                    columns = columns[: chunk_df.shape[1]]
-            chunk_df.columns = columns
-
-            cat_col_name = next((c for c in columns if c.lower() == "category"), None)
-            first_cat = str(chunk_df.iloc[0][cat_col_name]) if (cat_col_name and not chunk_df.empty) else "UNKNOWN"
-            top_level_name = top_of_category(first_cat) or "UNKNOWN"
-            sheet_name = re.sub(r"[\s/\\*?:\\[\\]]", "_", str(top_level_name).title())[:31]
-
-            chunk_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        names = [name for name, _, _ in sections]
+        if len(set(names)) != len(names):
+            # write_only는 append만 가능 → 같은 시트명에 덮어쓰는 경우만 기존 DataFrame 경로
+            with pd.ExcelWriter(output, engine="openpyxl") as writer:
+                for sheet_name, columns, rows in sections:
+                    pd.DataFrame(rows, columns=columns).to_excel(writer, sheet_name=sheet_name, index=False)
+        else:
+            # write_only: Cell 객체를 쌓지 않고 행 단위로 XML에 흘려보냄 (lxml 설치 시 더 빠름)
+            wb = openpyxl.Workbook(write_only=True)
+            thin = Side(style="thin")
+            header_font = Font(bold=True)
+            header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            header_align = Alignment(horizontal="center", vertical="top")
+            for sheet_name, columns, rows in sections:
+                ws = wb.create_sheet(sheet_name)
+                header = []
+                for v in columns:
+                    cell = WriteOnlyCell(ws, value=v)
+                    cell.font, cell.border, cell.alignment = header_font, header_border, header_align
+                    header.append(cell)
+                ws.append(header)
+                for row in rows:
+                    ws.append([v if v != "" else None for v in row])
+            wb.save(output)
 
     output.seek(0)
     print("Final template file generated successfully (xlsx).")
     return output
 
-def export_tem_csv(sh: gspread.Spreadsheet) -> Optional[bytes]:
+def export_tem_csv(sh: gspread.Spreadsheet, values: Optional[List[List[str]]] = None) -> Optional[bytes]:
     """
     TEM_OUTPUT 시트를 CSV(bytes)로 반환.
     - A열 PID 제거 및 Category 정규화 포함.
+    - values(fetch_tem_values 결과)를 넘기면 시트 재조회 생략
     """
     if not sh:
         return None
     try:
-        ws = safe_worksheet(sh, "TEM_OUTPUT")
-        vals = with_retry(lambda: ws.get_all_values()) or []
+        vals = values if values is not None else fetch_tem_values(sh, "TEM_OUTPUT")
         if not vals:
             return None
 
-        processed_vals = []
+        # 행을 만들면서 바로 UTF-8(BOM) 바이트 버퍼에 기록
+        # (처리 결과 리스트 + StringIO 문자열 + encode 사본을 따로 들고 있지 않음)
+        buf = io.BytesIO()
+        text = io.TextIOWrapper(buf, encoding="utf-8-sig", newline="")
+        writer = csv.writer(text)
+        wrote = False
         current_headers = None
         for row in vals:
             if (row[1] if len(row) > 1 else "").strip().lower() == "category":
                 current_headers = row[1:]
-                processed_vals.append(current_headers)
+                writer.writerow(current_headers)
+                wrote = True
                 continue
             
             if current_headers and len(row) > 1:
                 data_row = row[1:]
                 if len(data_row) > 0 and header_key(current_headers[0]) == "category":
                     data_row[0] = re.sub(r"\s*-\s*", "-", data_row[0])
-                processed_vals.append(data_row)
+                writer.writerow(data_row)
+                wrote = True
             elif len(row) > 0:
-                processed_vals.append(row[1:])
+                writer.writerow(row[1:])
+                wrote = True
 
-        if not processed_vals:
+        if not wrote:
             return None
-            
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerows(processed_vals)
-        return buf.getvalue().encode("utf-8-sig")
+
+        text.flush()
+        data = buf.getvalue()
+        text.detach()
+        return data
     except Exception as e:
         print(f"[WARN] TEM_OUTPUT CSV 변환 실패: {e}")
         return None
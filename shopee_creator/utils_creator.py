@@ -16,24 +16,48 @@ import re
 import time
 import random
 from pathlib import Path
-from typing import Optional, List, Dict, Callable, Iterable, Sequence, Any # Any 추가
+from typing import TYPE_CHECKING, Optional, List, Dict, Callable, Iterable, Sequence, Any # Any 추가
 
-import gspread
-from gspread.exceptions import WorksheetNotFound
+import numpy as np
 from dotenv import load_dotenv
 
+from shared.text import extract_sheet_id as _extract_sheet_id
+from shared.text import sheet_link  # noqa: F401  (lru_cache 공용 구현 re-export)
+
 # --- add to shopee_creator/utils_creator.py ---
 # join_url 관련 임포트 및 함수 제거됨
 # --- end add ---
 
 
-# Streamlit / Google Auth (서비스계정)
+if TYPE_CHECKING:
+    import gspread
+
+# Streamlit
 try:
     import streamlit as st
-    from google.oauth2.service_account import Credentials
 except Exception:  # 로컬 스크립트 실행 등
     st = None  # type: ignore
-    Credentials = None  # type ignore
+
+# gspread / Google Auth는 첫 인증·API 호출 시점에 import (페이지 첫 렌더 지연 방지)
+_gspread = None
+_Credentials = None
+
+def _load_gspread():
+    global _gspread
+    if _gspread is None:
+        import gspread
+        _gspread = gspread
+    return _gspread
+
+def _load_credentials():
+    global _Credentials
+    if _Credentials is None:
+        try:
+            from google.oauth2.service_account import Credentials
+        except Exception:
+            return None
+        _Credentials = Credentials
+    return _Credentials
 
 # =============================
 # 환경 변수 & .env 로딩
@@ -77,7 +101,8 @@ def get_bool_env(name: str, default: bool = False) -> bool:
 
 def _authorize_gspread_via_secrets():
     """Streamlit secrets를 사용하여 인증"""
-    if st is None or not hasattr(st, "secrets"):
+    Credentials = _load_credentials()
+    if st is None or Credentials is None or not hasattr(st, "secrets"):
         return None
     
     try:
@@ -87,7 +112,7 @@ def _authorize_gspread_via_secrets():
                 "https://www.googleapis.com/auth/drive",
             ]
             creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
-            return gspread.authorize(creds)
+            return _load_gspread().authorize(creds)
     except Exception:
         pass
     return None
@@ -101,7 +126,7 @@ def authorize_gspread() -> gspread.Client:
     
     # 2. GOOGLE_APPLICATION_CREDENTIALS 또는 service_account.json (개발 용)
     try:
-        return gspread.service_account()
+        return _load_gspread().service_account()
     except Exception as e:
         # 모든 시도가 실패하면 RuntimeError 발생
         raise RuntimeError(
@@ -112,9 +137,14 @@ def authorize_gspread() -> gspread.Client:
 # =============================
 # 문자열/헤더 유틸
 # =============================
+# 행/헤더 단위로 반복 호출되므로 패턴은 모듈 로드 시 1회만 컴파일
+_RE_HEADER_KEY = re.compile(r"[\W_]+")
+_RE_SLASH_WS = re.compile(r"\s*/\s*")
+_RE_CATEGORY_ID = re.compile(r"^\s*\d+\s*-\s*(.*)")
+
 def header_key(s: str) -> str:
     """헤더 정규화: 소문자화, 공백/특수문자 제거"""
-    return re.sub(r"[\W_]+", "", str(s or "").lower())
+    return _RE_HEADER_KEY.sub("", str(s or "").lower())
 
 def top_of_category(s: str) -> str:
     """
@@ -122,7 +152,7 @@ def top_of_category(s: str) -> str:
     (예: '101643 - Beauty/Makeup/Lips/Lip Gloss' -> 'Beauty')
     """
     # 1. 문자열 전체에서 슬래시 주변 공백 제거
-    normalized_s = re.sub(r'\s*/\s*', '/', str(s or "").strip())
+    normalized_s = _RE_SLASH_WS.sub('/', str(s or "").strip())
     # 2. 첫 번째 슬래시까지만 자름
     parts = normalized_s.split("/", 1)
     
@@ -132,7 +162,7 @@ def top_of_category(s: str) -> str:
     top_part = parts[0].strip()
     
     # 3. "101643 - Beauty" 패턴에서 숫자 코드와 하이픈 제거
-    match = re.match(r'^\s*\d+\s*-\s*(.*)', top_part)
+    match = _RE_CATEGORY_ID.match(top_part)
     if match:
         return match.group(1).strip()
         
@@ -142,10 +172,6 @@ def get_tem_sheet_name() -> str:
     """TEM_OUTPUT 시트 이름"""
     return get_env("TEM_OUTPUT_SHEET_NAME", "TEM_OUTPUT")
 
-def sheet_link(ss_id: str) -> str:
-    """스프레드시트 ID로 링크 생성"""
-    return f"https://docs.google.com/spreadsheets/d/{ss_id}/edit"
-
 
 # =============================
 # Sheets 접근 유틸
@@ -154,28 +180,39 @@ def extract_sheet_id(url_or_id: str) -> str:
     """Google Sheets URL 또는 순수 ID를 모두 허용. URL이면 d/<ID> 패턴에서 ID 추출."""
     if not url_or_id:
         raise ValueError("빈 시트 URL/ID 입니다.")
+    # 파싱은 shared.text 공용 구현(모듈 레벨 컴파일 정규식) 사용, 패턴 불일치 시 순수 ID로 간주
+    return _extract_sheet_id(url_or_id) or url_or_id.strip()
+
+# 재시도해도 결과가 같은 결정적 오류 (탭/시트 없음) → 즉시 재전파
+_NO_RETRY_ERRORS = frozenset({"WorksheetNotFound", "SpreadsheetNotFound"})
+_PROGRAMMING_ERRORS = (TypeError, AttributeError, NameError, KeyError, IndexError)  # 코드 오류 → 즉시 재전파
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+_MAX_WAIT = 60.0  # 서버 힌트가 커도 이 이상은 기다리지 않음
+
+def _retry_after(e: Exception) -> Optional[float]:
+    """429 응답의 Retry-After 헤더(초). 없거나 HTTP-date 형식이면 None."""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
     try:
-        # URL에서 ID 추출 패턴: /d/<ID>
-        m = re.search(r"/spreadsheets/d/([a-zA-Z0-9_-]+)", url_or_id)
-        if m:
-            return m.group(1)
-        # 순수 ID로 간주
-        return url_or_id
-    except Exception as e:
-        raise ValueError(f"올바른 Google Sheets URL 또는 ID 형식이 아닙니다: {e}") from e
+        return max(0.0, float(headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
 
 def with_retry[T](func: Callable[[], T], max_tries=5, delay=1.0) -> Optional[T]:
-    """gspread 요청에 대한 지수 백오프/재시도 래퍼"""
+    """gspread 요청에 대한 지수 백오프/재시도 래퍼 (429는 Retry-After와 백오프 중 긴 쪽만큼 대기)"""
     for i in range(max_tries):
         try:
             return func()
-        except gspread.exceptions.APIError as e:
+        except _load_gspread().exceptions.APIError as e:
             # 429 Rate Limit이나 일시적 에러 시 재시도
-            if i == max_tries - 1 or e.response.status_code not in (429, 500, 503):
+            status = e.response.status_code
+            if i == max_tries - 1 or status not in _RETRY_STATUS:
                 raise
-            time.sleep(delay * (2 ** i) + random.random())
-        except Exception:
-            if i == max_tries - 1:
+            wait = delay * (2 ** i) + random.random()
+            if status == 429:
+                wait = max(wait, _retry_after(e) or 0.0)
+            time.sleep(min(wait, _MAX_WAIT))
+        except Exception as e:
+            if i == max_tries - 1 or isinstance(e, _PROGRAMMING_ERRORS) or type(e).__name__ in _NO_RETRY_ERRORS:
                 raise
             time.sleep(delay * (2 ** i) + random.random())
     return None
@@ -212,38 +249,59 @@ def forward_fill_by_group(
     지정된 컬럼(fill_col_indices)의 유효한 값을 하위 행에 채워넣음 (Forward Fill).
     reset_when: 이 함수가 True를 반환하면 그룹이 단절된 것으로 간주하고 필링 중단.
     """
-    output = [list(row) for row in data]
-    
-    # 헤더는 필링하지 않음
-    for r in range(header_rows, len(output)):
-        row = output[r]
-        
-        # 1. 그룹 단절 체크
-        if reset_when(row):
-            # 그룹이 단절되면 이전에 필링된 값들을 초기화
-            for j in fill_col_indices:
-                if j < len(row):
-                    row[j] = ""
+    n_rows = len(data)
+    if n_rows == 0:
+        return []
+    lens = [len(row) for row in data]
+    width = max(lens)
+    ragged = min(lens) != width
+
+    # 행별 list 대신 (행 x 열) object 배열 1개로 보관 (짧은 행은 None 패딩)
+    arr = np.empty((n_rows, width), dtype=object)
+    if ragged:
+        arr.fill(None)
+        for r, row in enumerate(data):
+            arr[r, :lens[r]] = row
+    elif width:
+        arr[:, :] = data
+    lens_arr = np.asarray(lens)
+
+    start = header_rows  # 헤더는 필링하지 않음 (첫 데이터 행의 이전 행 = 시드)
+    if start >= n_rows:
+        return [list(row) for row in data]
+
+    # 1. 그룹 단절 행 (reset_when 은 사용자 콜백이라 행 단위 호출)
+    reset = np.fromiter((bool(reset_when(list(data[r]))) for r in range(start, n_rows)), dtype=bool, count=n_rows - start)
+    seed = start - 1  # 기존 동작과 동일하게 output[r-1] 기준 (header_rows=0이면 마지막 행)
+
+    positions = np.arange(n_rows - start + 1)
+    for j in fill_col_indices:
+        if not 0 <= j < width:
             continue
-        
-        # 2. 그룹 값이 바뀌지 않았거나 비어있는 경우 (이전 그룹과 동일)
-        prev_row = output[r-1]
-        
-        # 이전 행의 그룹 값(group_idx)이 현재 행의 그룹 값과 같거나, 현재 행의 그룹 값이 비어있다면 필링 시도
-        is_same_group = (
-            (group_idx < len(row) and not (row[group_idx] or "").strip()) or # 현재 그룹 값 비어있음
-            (group_idx < len(row) and group_idx < len(prev_row) and (row[group_idx] or "").strip() == (prev_row[group_idx] or "").strip())
-        )
-
-        # 3. 필링 실행 (fill_col_indices의 값이 비어있을 경우, 이전 행 값으로 채움)
-        for j in fill_col_indices:
-            if j < len(row) and j < len(prev_row):
-                current_val = (row[j] or "").strip()
-                prev_val = (prev_row[j] or "").strip()
-                
-                if not current_val and prev_val:
-                    row[j] = prev_val
-    
+        present = np.empty(n_rows - start + 1, dtype=bool)
+        present[0] = j < lens[seed]
+        present[1:] = j < lens_arr[start:]
+        col = arr[start:, j]  # view → 아래 대입이 arr에 바로 반영
+        stripped = np.empty(n_rows - start + 1, dtype=object)
+        stripped[0] = str(arr[seed, j] or "").strip() if present[0] else ""
+        stripped[1:] = [str(v or "").strip() for v in col]
+        stripped[1:][reset] = ""
+        stripped[~present] = ""
+
+        # 2. 값이 있거나(reset 포함) 셀이 없는 위치가 다음 행들의 소스가 됨 → 인덱스 누적 최대값으로 ffill
+        is_src = (stripped != "") | ~present
+        is_src[1:] |= reset
+        src_pos = np.maximum.accumulate(np.where(is_src, positions, 0))
+        filled = stripped[src_pos]
+
+        # 3. 필링 실행: 현재 값이 비어 있고, 직전 소스 값이 있을 때만 채움
+        do_fill = ~is_src[1:] & (filled[1:] != "")  # 셀이 없는 위치는 소스로 분류돼 자동 제외
+        col[reset & present[1:]] = ""
+        col[do_fill] = filled[1:][do_fill]
+
+    output = arr.tolist()
+    if ragged:
+        output = [row[:n] for row, n in zip(output, lens)]
     return output
 
 # end of MASTER UTILS
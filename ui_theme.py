@@ -1,6 +1,7 @@
 # ui_theme.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 import base64
 import streamlit as st
@@ -38,21 +39,11 @@ def title_with_icon(title: str, icon_name: str, size: int = 28) -> None:
     else:
         st.title(title)
 
-def apply_theme(
-    *,
-    hide_sidebar: bool = False,
-) -> None:
-    """
-    • 다크 모노톤 배경 + 글래스 스타일
-    • 사이드바 톤(배경/블러/활성/기본 링크)
-    • 폼 컨트롤(입력, 셀렉트, 플레이스홀더) 톤
-    • 업로더(Drag&Drop) 톤
-    • 버튼/다운로드 버튼 톤(활성/호버/비활성)
-    """
+@lru_cache(maxsize=16)
+def _theme_css(hide_sidebar: bool, page_css: str) -> str:
+    """테마 <style> 블록 문자열 (옵션 조합별로 한 번만 생성)"""
     css_sidebar_hide = "section[data-testid='stSidebar']{display:none !important;}" if hide_sidebar else ""
-
-    st.markdown(
-        f"""
+    return f"""
 <style>
 /* ---------- App 배경/기본 폰트 ---------- */
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;700;800&display=swap');
@@ -181,7 +172,22 @@ div.stDownloadButton > button:disabled {{
   color: #D1D5DB !important;       /* Gray-300 */
   box-shadow: none !important;
 }}
+{page_css}
 </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def apply_theme(
+    *,
+    hide_sidebar: bool = False,
+    page_css: str = "",
+) -> None:
+    """
+    • 다크 모노톤 배경 + 글래스 스타일
+    • 사이드바 톤(배경/블러/활성/기본 링크)
+    • 폼 컨트롤(입력, 셀렉트, 플레이스홀더) 톤
+    • 업로더(Drag&Drop) 톤
+    • 버튼/다운로드 버튼 톤(활성/호버/비활성)
+    • page_css: 페이지 전용 CSS (같은 <style> 블록 끝에 덧붙임)
+    """
+    st.markdown(_theme_css(hide_sidebar, page_css), unsafe_allow_html=True)